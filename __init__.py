@@ -27,58 +27,66 @@ bl_info = {
 import bpy
 from bpy.app.handlers import persistent
 
-# Handle reloading for development - MUST reload in dependency order
+# Submodules in dependency order - reloads MUST follow this order
 # debug_log first (no deps), transforms, cache, anchors, drawing, handlers, operators, settings, ui
-if "debug_log" in locals():
+_SUBMODULES = (
+    "debug_log",
+    "transforms",
+    "cache",
+    "anchors",
+    "drawing",
+    "handlers",
+    "operators",
+    "settings",
+    "ui",
+)
+
+# Handle reloading for development
+if "settings" in locals():
     import importlib
-    importlib.reload(debug_log)
-    importlib.reload(transforms)
-    importlib.reload(cache)
-    importlib.reload(anchors)
-    importlib.reload(drawing)
-    importlib.reload(handlers)
-    importlib.reload(operators)
-    importlib.reload(settings)
-    importlib.reload(ui)
-
-from . import debug_log
-from . import transforms
-from . import cache
-from . import anchors
-from . import drawing  # drawing before handlers (handlers imports from drawing)
-from . import handlers
-from . import operators
+    import sys
+    for _name in _SUBMODULES:
+        _module = sys.modules.get(f"{__name__}.{_name}")
+        if _module is not None:
+            importlib.reload(_module)
+
+# Only settings is imported eagerly: its PropertyGroup is needed for the
+# Scene.world_onion PointerProperty. Everything else is imported in register()
+# so importing the addon package stays cheap.
 from . import settings
-from . import ui
 
 
-# All classes to register
-classes = (
-    settings.WorldOnionSettings,
-    *operators.operator_classes,
-    *ui.panel_classes,
-)
+# All classes to register (filled in by register())
+classes = ()
 
 
 @persistent
 def on_load_post(dummy):
     """Called after a .blend file is loaded. Re-register draw handlers if addon is enabled."""
+    from . import cache, drawing
+
     # v8.1: Always re-register driver namespace on file load (drivers persist but namespace doesn't)
     drawing.register_driver_namespace()
 
-    # Check if any scene has the addon enabled
-    for scene in bpy.data.scenes:
-        if hasattr(scene, 'world_onion') and scene.world_onion.enabled:
+    # Check if any scene has the addon enabled - active scene first, since it is
+    # the common case and avoids walking every scene in multi-scene files
+    active_scene = bpy.context.scene
+    scenes = (active_scene,) if active_scene is not None else ()
+    scenes += tuple(s for s in bpy.data.scenes if s != active_scene)
+
+    for scene in scenes:
+        wo = getattr(scene, 'world_onion', None)
+        if wo is not None and wo.enabled:
             drawing.register_draw_handlers()
 
             # v9.3: Re-bake shrinkwrap if it was enabled
             # Module globals are reset on file load, so baked offset dictionary is empty.
             # Without this, driver returns 0.0 and shrinkwrap doesn't work until user scrubs.
             # on_load_post() is a safe context - driver setup will succeed here.
-            if scene.world_onion.depth_interaction_enabled:
+            if wo.depth_interaction_enabled:
                 gp_obj = cache.get_active_gp(bpy.context)
                 if gp_obj:
-                    drawing.bake_shrinkwrap_offsets(gp_obj, scene.world_onion, scene, setup_driver=True)
+                    drawing.bake_shrinkwrap_offsets(gp_obj, wo, scene, setup_driver=True)
                     scene.frame_set(scene.frame_current)
 
             # v8.5: Start cursor sync modal operator
@@ -90,6 +98,17 @@ def on_load_post(dummy):
 
 def register():
     """Register the addon."""
+    global classes
+
+    # Deferred submodule imports - only what register() uses, the rest load as their deps
+    from . import drawing, handlers, operators, ui
+
+    classes = (
+        settings.WorldOnionSettings,
+        *operators.operator_classes,
+        *ui.panel_classes,
+    )
+
     # Register classes
     for cls in classes:
         bpy.utils.register_class(cls)
@@ -114,6 +133,8 @@ def register():
 
 def unregister():
     """Unregister the addon."""
+    from . import drawing, handlers
+
     # Unregister load handler
     if on_load_post in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(on_load_post)
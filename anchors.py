@@ -3,23 +3,52 @@ Anchor system for world-space drawing positions.
 Removes legacy lock system. Anchors now just map to keyframe locations.
 """
 
-import bpy
+import bisect
 import json
+import sys
+
+import bpy
+import numpy as np
 from mathutils import Vector, Matrix
 
 from .transforms import get_layer_transform
 
-
-# JSON cache - avoid re-parsing JSON on every anchor lookup
-_anchor_json_cache = None
-_anchor_json_cache_gp = None
+# Legacy anchor data was a JSON string. Use orjson to parse it when available
+# (C implementation); Blender does not bundle it, so fall back to json.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+# Parsed anchor cache - avoid converting the ID property tree on every anchor lookup
+# Structure: {gp_obj.as_pointer(): (revision, anchors_dict)}
+# The revision counter is stored on the GP object next to the anchor data and bumped
+# on every write, so undo or external edits to the custom property are detected.
+#
+# Storage: anchors live in a nested ID property group (Blender persists dicts/lists
+# natively), so reading needs no JSON parse. Older files stored a JSON string,
+# either unversioned (legacy) or wrapped as {"_v": 2, "data": anchors}. The versioned
+# JSON string is still written when a layer name is too long to be a group key.
+_ANCHOR_PROP = "world_onion_anchors"
+_ANCHOR_REV_PROP = "world_onion_anchors_rev"
+_ANCHOR_JSON_VERSION = 2
+_IDPROP_KEY_MAX_BYTES = 63  # Blender limit for ID property names (UTF-8 bytes)
+_ANCHOR_CACHE = {}
+
+# Int-keyed read index - lets lookups use the int frame directly (no str() + string hash)
+# Structure: {gp_obj.as_pointer(): {layer_name: {frame_int: entry}}}
+# Entries are shared with _ANCHOR_CACHE; the index is dropped whenever that dict is
+# replaced or mutated and rebuilt lazily on the next lookup. Stored keys stay strings.
+_ANCHOR_INT_INDEX = {}
 
 
 def invalidate_anchor_json_cache():
-    """Clear anchor JSON cache. Call when anchor data changes."""
-    global _anchor_json_cache, _anchor_json_cache_gp
-    _anchor_json_cache = None
-    _anchor_json_cache_gp = None
+    """Clear anchor JSON cache. Call when anchor data changes externally."""
+    _ANCHOR_CACHE.clear()
+    _ANCHOR_INT_INDEX.clear()
 
 
 def _invalidate_all_anchor_caches():
@@ -27,76 +56,295 @@ def _invalidate_all_anchor_caches():
     invalidate_anchor_json_cache()
 
 
+def _parse_anchor_json(raw):
+    """Parse anchor data stored as a JSON string by older versions.
+
+    Returns the anchors dict, converting legacy list entries to {"pos": [...]}.
+    """
+    data = _loads(raw)
+
+    # Versioned JSON needs no per-entry conversion
+    if data.get("_v") == _ANCHOR_JSON_VERSION:
+        return data["data"]
+
+    # Convert legacy format (list) to new format (dict with pos and cam_dir)
+    for layer_name in data:
+        for frame_str in data[layer_name]:
+            anchor_data = data[layer_name][frame_str]
+            if isinstance(anchor_data, list):
+                # Legacy format: just position as list
+                data[layer_name][frame_str] = {"pos": anchor_data}
+
+    return data
+
+
+def _fits_group_keys(anchors):
+    """True if every layer name can be stored as an ID property group key."""
+    return all(len(layer_name.encode("utf-8")) <= _IDPROP_KEY_MAX_BYTES for layer_name in anchors)
+
+
+def _parse_anchors(gp_obj):
+    """Read anchor data from the GP object.
+
+    Returns (anchors_dict, migrated). ID property groups are converted with a
+    single C-level to_dict(); JSON strings take the slow parse path and report
+    migrated=True when they can be rewritten as a group.
+    """
+    raw = gp_obj.get(_ANCHOR_PROP)
+    if raw is None:
+        return {}, False
+
+    if isinstance(raw, str):
+        try:
+            data = _parse_anchor_json(raw)
+        except (json.JSONDecodeError, TypeError, KeyError, AttributeError):
+            # Invalid or corrupted anchor data
+            return {}, False
+        return data, _fits_group_keys(data)
+
+    try:
+        return raw.to_dict(), False
+    except AttributeError:
+        # Unexpected property type
+        return {}, False
+
+
 def get_anchors(gp_obj, use_cache=True):
     """Get anchor data from GP object custom property.
 
-    PERFORMANCE: Uses module-level cache to avoid JSON parsing on every call.
-    Pass use_cache=False to bypass cache (e.g., after external modification).
+    PERFORMANCE: Converted dict is cached per GP object and reused until the
+    object's anchor revision changes, so repeat calls skip conversion entirely.
+    JSON data from older files is rewritten as an ID property group on first
+    read, so the JSON parse runs at most once per file.
+    Pass use_cache=False to force a re-parse (e.g., after external modification).
+    Inside an AnchorBatch for this object, pending edits are flushed before a
+    forced re-parse so they are not discarded.
     """
-    global _anchor_json_cache, _anchor_json_cache_gp
-
+    global _batch_dirty
     if gp_obj is None:
         return {}
 
-    # Check cache first (identity comparison for speed)
-    if use_cache and gp_obj is _anchor_json_cache_gp and _anchor_json_cache is not None:
-        return _anchor_json_cache
+    key = gp_obj.as_pointer()
+    if not use_cache and _BATCHING and _batch_gp_ptr == key and _batch_dirty:
+        _flush(gp_obj)
+        _batch_dirty = False
+    rev = gp_obj.get(_ANCHOR_REV_PROP, 0)
+
+    entry = _ANCHOR_CACHE.get(key)
+    if use_cache and entry is not None and entry[0] == rev:
+        return entry[1]
+
+    data, migrated = _parse_anchors(gp_obj)
+    # Intern keys once per parse - frame keys then match _frame_key() results by
+    # identity, so string comparisons in the per-anchor loops short-circuit
+    data = {
+        sys.intern(layer_name): {sys.intern(frame_str): entry for frame_str, entry in layer_anchors.items()}
+        for layer_name, layer_anchors in data.items()
+    }
+    _ANCHOR_CACHE[key] = (rev, data)
+    _ANCHOR_INT_INDEX.pop(key, None)
+
+    if migrated:
+        try:
+            _flush(gp_obj)
+        except (AttributeError, RuntimeError):
+            # Writing ID properties not allowed here (draw/render).
+            # Cached dict is still valid; the next anchor write persists the new format.
+            pass
+
+    return data
+
+
+def _get_anchors_mut(gp_obj):
+    """Get the cached anchor dict for in-place mutation.
+
+    Mutations are persisted by a single _flush() call afterwards.
+    """
+    return get_anchors(gp_obj)
 
-    if "world_onion_anchors" not in gp_obj:
-        return {}
 
-    try:
-        data = json.loads(gp_obj["world_onion_anchors"])
-
-        # Convert legacy format (list) to new format (dict with pos and cam_dir)
-        for layer_name in data:
-            for frame_str in data[layer_name]:
-                anchor_data = data[layer_name][frame_str]
-                if isinstance(anchor_data, list):
-                    # Legacy format: just position as list
-                    data[layer_name][frame_str] = {"pos": anchor_data}
-
-        # Update cache
-        _anchor_json_cache = data
-        _anchor_json_cache_gp = gp_obj
-
-        return data
-    except (json.JSONDecodeError, TypeError, KeyError):
-        # Invalid or corrupted anchor data
-        return {}
+def _flush(gp_obj):
+    """Write the cached anchor dict to the GP object and bump its revision.
+
+    Layer names longer than an ID property key allows are stored as versioned
+    JSON instead, so they are never truncated or rejected.
+    """
+    entry = _ANCHOR_CACHE.get(gp_obj.as_pointer())
+    anchors = entry[1] if entry is not None else {}
+    rev = gp_obj.get(_ANCHOR_REV_PROP, 0) + 1
+    if _fits_group_keys(anchors):
+        # Blender converts nested dicts/lists to an ID property group (no JSON)
+        gp_obj[_ANCHOR_PROP] = anchors
+    else:
+        gp_obj[_ANCHOR_PROP] = json.dumps({"_v": _ANCHOR_JSON_VERSION, "data": anchors})
+    gp_obj[_ANCHOR_REV_PROP] = rev
+    _ANCHOR_CACHE[gp_obj.as_pointer()] = (rev, anchors)
+    _ANCHOR_INT_INDEX.pop(gp_obj.as_pointer(), None)
+
+
+def _flush_records(gp_obj, layer_name, frame_strs):
+    """Write only the given frame records of one layer and bump the revision.
+
+    PERFORMANCE: Edits the stored ID property group in place, so a single
+    anchor change costs one record write instead of reassigning every anchor.
+    Falls back to _flush() when the stored property is not a group or the
+    layer name is too long to be a group key.
+    """
+    key = gp_obj.as_pointer()
+    entry = _ANCHOR_CACHE.get(key)
+    prop = gp_obj.get(_ANCHOR_PROP)
+    if (entry is None or not hasattr(prop, 'to_dict')
+            or len(layer_name.encode("utf-8")) > _IDPROP_KEY_MAX_BYTES):
+        _flush(gp_obj)
+        return
+
+    anchors = entry[1]
+    layer_anchors = anchors.get(layer_name, {})
+    layer_group = prop.get(layer_name)
+    if layer_group is None:
+        prop[layer_name] = layer_anchors
+    else:
+        for frame_str in frame_strs:
+            record = layer_anchors.get(frame_str)
+            if record is not None:
+                layer_group[frame_str] = record
+            elif frame_str in layer_group:
+                del layer_group[frame_str]
+
+    rev = gp_obj.get(_ANCHOR_REV_PROP, 0) + 1
+    gp_obj[_ANCHOR_REV_PROP] = rev
+    _ANCHOR_CACHE[key] = (rev, anchors)
+    _ANCHOR_INT_INDEX.pop(key, None)
+
+
+# Batched writes - setters skip serialization while a batch is open for the object
+_BATCHING = False
+_batch_gp_ptr = None
+_batch_dirty = False
+
+
+class AnchorBatch:
+    """Defer anchor serialization until the block exits.
+
+    Usage:
+        with AnchorBatch(gp_obj):
+            for layer_name, frame in moved:
+                migrate_anchor_data(gp_obj, layer_name, frame, frame + 1)
+
+    PERFORMANCE: N setter calls write the anchor property once instead of N times.
+    """
+
+    def __init__(self, gp_obj):
+        self.gp_obj = gp_obj
+        self._owner = False
+
+    def __enter__(self):
+        global _BATCHING, _batch_gp_ptr, _batch_dirty
+        # Nested batches join the outermost one
+        if not _BATCHING and self.gp_obj is not None:
+            _BATCHING = True
+            _batch_gp_ptr = self.gp_obj.as_pointer()
+            _batch_dirty = False
+            self._owner = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _BATCHING, _batch_gp_ptr, _batch_dirty
+        if not self._owner:
+            return False
+        dirty = _batch_dirty
+        _BATCHING = False
+        _batch_gp_ptr = None
+        _batch_dirty = False
+        if dirty:
+            _flush(self.gp_obj)
+        return False
+
+
+def _mark_dirty(gp_obj, layer_name=None, frame_strs=()):
+    """Persist a mutation now, or defer it if a batch is open for this object.
+
+    Pass layer_name and the touched frame_strs to write just those records.
+    """
+    global _batch_dirty
+    if _BATCHING and _batch_gp_ptr == gp_obj.as_pointer():
+        _batch_dirty = True
+        # Cached dict changed in place without a revision bump
+        _ANCHOR_INT_INDEX.pop(gp_obj.as_pointer(), None)
+        return
+    if layer_name is None:
+        _flush(gp_obj)
+    else:
+        _flush_records(gp_obj, layer_name, frame_strs)
 
 
 def set_anchors(gp_obj, anchors):
     """Save anchor data to GP object custom property."""
     if gp_obj is None:
         return
-    gp_obj["world_onion_anchors"] = json.dumps(anchors)
-    # Invalidate caches since anchor data changed
-    _invalidate_all_anchor_caches()
+    _ANCHOR_CACHE[gp_obj.as_pointer()] = (gp_obj.get(_ANCHOR_REV_PROP, 0), anchors)
+    _flush(gp_obj)
+
+
+def _frame_key(frame):
+    """Anchor dict key for a frame number.
+
+    Interned so keys written this session and later lookups for the same frame
+    share identity, letting dict lookups short-circuit on `is` before `__eq__`.
+    """
+    return sys.intern(str(frame))
+
+
+def _get_int_index(gp_obj):
+    """Get the {layer_name: {frame_int: entry}} read index for a GP object."""
+    anchors = get_anchors(gp_obj)  # Validates revision, drops a stale index
+    key = gp_obj.as_pointer()
+    index = _ANCHOR_INT_INDEX.get(key)
+    if index is None:
+        index = {
+            layer_name: {int(frame_str): entry for frame_str, entry in layer_anchors.items()}
+            for layer_name, layer_anchors in anchors.items()
+        }
+        _ANCHOR_INT_INDEX[key] = index
+    return index
+
+
+def _get_frame_entry(gp_obj, layer_name, frame):
+    """Get the raw anchor entry for a layer and frame with a single lookup chain.
+
+    Returns the stored entry dict or None. Legacy list entries never reach
+    here - get_anchors() converts them once at parse time.
+
+    PERFORMANCE: Looks up the int frame in the int-keyed index, no str() per call.
+    """
+    if gp_obj is None:
+        return None
+    layer_anchors = _get_int_index(gp_obj).get(layer_name)
+    if layer_anchors is None:
+        return None
+    return layer_anchors.get(int(frame))
+
+
+def get_anchor_xyz_for_frame(gp_obj, layer_name, frame):
+    """Get the raw stored anchor position for a specific layer and frame.
+
+    Returns the stored [x, y, z] sequence (not a Vector) or None. Use this when
+    the caller only needs components or assigns straight into an RNA vector,
+    to skip the Vector allocation.
+    """
+    data = _get_frame_entry(gp_obj, layer_name, frame)
+    if data is None:
+        return None
+    return data.get("pos")
 
 
 def get_anchor_for_frame(gp_obj, layer_name, frame):
     """Get the anchor position for a specific layer and frame.
-    
+
     Returns Vector or None.
     """
-    anchors = get_anchors(gp_obj)
-    
-    if layer_name not in anchors:
-        return None
-    
-    frame_str = str(frame)
-    if frame_str not in anchors[layer_name]:
-        return None
-    
-    data = anchors[layer_name][frame_str]
-    
-    if isinstance(data, dict) and "pos" in data:
-        return Vector(data["pos"])
-    elif isinstance(data, list):
-        return Vector(data)
-    
-    return None
+    pos = get_anchor_xyz_for_frame(gp_obj, layer_name, frame)
+    return Vector(pos) if pos is not None else None
 
 
 def set_anchor_for_frame(gp_obj, layer_name, frame, position):
@@ -104,44 +352,99 @@ def set_anchor_for_frame(gp_obj, layer_name, frame, position):
 
     position: Vector or tuple (x, y, z)
     """
-    anchors = get_anchors(gp_obj)
+    if gp_obj is None:
+        return
+
+    anchors = _get_anchors_mut(gp_obj)
 
     if layer_name not in anchors:
         anchors[layer_name] = {}
 
-    frame_str = str(frame)
+    frame_str = _frame_key(frame)
     anchors[layer_name][frame_str] = {"pos": [position[0], position[1], position[2]]}
-    set_anchors(gp_obj, anchors)
+    _mark_dirty(gp_obj, layer_name, (frame_str,))
 
 
 def remove_anchor_for_frame(gp_obj, layer_name, frame):
     """Remove the anchor for a specific layer and frame."""
-    anchors = get_anchors(gp_obj)
+    if gp_obj is None:
+        return
+
+    anchors = _get_anchors_mut(gp_obj)
 
     if layer_name not in anchors:
         return
 
-    frame_str = str(frame)
+    frame_str = _frame_key(frame)
     if frame_str in anchors[layer_name]:
         del anchors[layer_name][frame_str]
-        set_anchors(gp_obj, anchors)
+        _mark_dirty(gp_obj, layer_name, (frame_str,))
 
 
 def migrate_anchor_data(gp_obj, layer_name, old_frame, new_frame):
     """Move anchor data from old frame to new frame."""
-    anchors = get_anchors(gp_obj)
+    if gp_obj is None:
+        return
+
+    anchors = _get_anchors_mut(gp_obj)
 
     if layer_name not in anchors:
         return
 
-    old_frame_str = str(old_frame)
-    new_frame_str = str(new_frame)
+    old_frame_str = _frame_key(old_frame)
+    new_frame_str = _frame_key(new_frame)
 
     if old_frame_str in anchors[layer_name]:
         # Move data to new frame
         anchors[layer_name][new_frame_str] = anchors[layer_name][old_frame_str]
         del anchors[layer_name][old_frame_str]
-        set_anchors(gp_obj, anchors)
+        _mark_dirty(gp_obj, layer_name, (old_frame_str, new_frame_str))
+
+
+# Keyframe number index - avoid walking layer.frames on every visible-keyframe lookup
+# Structure: {layer.as_pointer(): [frame_number, ...]}
+# Blender keeps layer.frames sorted by frame_number, so the list is bisectable.
+# Cleared with the keyframe cache (drawing.invalidate_keyframe_cache), which the
+# depsgraph handler runs when the keyframe set or the layer count changes.
+_KF_INDEX_CACHE = {}
+
+
+def invalidate_keyframe_index():
+    """Clear cached per-layer keyframe number lists."""
+    _KF_INDEX_CACHE.clear()
+
+
+def _get_keyframe_numbers(layer, rebuild=False):
+    """Get the cached sorted frame numbers of a layer, rebuilding on length change."""
+    key = layer.as_pointer()
+    nums = _KF_INDEX_CACHE.get(key)
+    if rebuild or nums is None or len(nums) != len(layer.frames):
+        # layer.frames is ordered by frame_number - bulk-read it, no sort needed
+        frames = layer.frames
+        arr = np.empty(len(frames), dtype=np.int32)
+        frames.foreach_get('frame_number', arr)
+        nums = arr.tolist()
+        _KF_INDEX_CACHE[key] = nums
+    return nums
+
+
+def _find_keyframe_index(layer, frame):
+    """Index of the keyframe at or before frame in layer.frames, or -1.
+
+    The cached list is only trusted when the live neighbours around the bisect
+    result still bracket the frame; otherwise (keyframe moved without changing
+    the count) the list is rebuilt once.
+    """
+    frames = layer.frames
+    nums = _get_keyframe_numbers(layer)
+    idx = bisect.bisect_right(nums, frame) - 1
+
+    if (idx < 0 or frames[idx].frame_number <= frame) and \
+            (idx + 1 >= len(nums) or frames[idx + 1].frame_number > frame):
+        return idx
+
+    nums = _get_keyframe_numbers(layer, rebuild=True)
+    return bisect.bisect_right(nums, frame) - 1
 
 
 def calculate_anchor_from_strokes(gp_obj, layer, frame_number, return_local=False):
@@ -167,11 +470,7 @@ def calculate_anchor_from_strokes(gp_obj, layer, frame_number, return_local=Fals
 
     # Find the visible keyframe (at or before frame_number)
     # This matches the logic in set_anchor_logic() for consistency
-    keyframe = None
-    for kf in layer.frames:
-        if kf.frame_number <= frame_number:
-            if keyframe is None or kf.frame_number > keyframe.frame_number:
-                keyframe = kf
+    keyframe = get_visible_keyframe(layer, frame_number)
 
     if keyframe is None or keyframe.drawing is None:
         return (None, None) if return_local else None
@@ -192,25 +491,23 @@ def calculate_anchor_from_strokes(gp_obj, layer, frame_number, return_local=Fals
     full_matrix = matrix_world @ layer_matrix
 
     # Compute anchor in WORLD coordinates (center XY, lowest Z)
-    world_min_z = float('inf')
-    world_sum_x = 0.0
-    world_sum_y = 0.0
-    count = 0
-
-    for p in pos_attr.data:
-        local_pos = Vector(p.vector)
-        world_pos = full_matrix @ local_pos
-        world_sum_x += world_pos.x
-        world_sum_y += world_pos.y
-        if world_pos.z < world_min_z:
-            world_min_z = world_pos.z
-        count += 1
-
-    if count == 0:
-        return (None, None) if return_local else None
+    # PERFORMANCE: Bulk-read positions with foreach_get and transform them with a
+    # single NumPy matmul instead of allocating Vectors per point.
+    count = len(pos_attr.data)
+    flat = np.empty(count * 3, dtype=np.float32)
+    pos_attr.data.foreach_get('vector', flat)
+    local_points = flat.reshape(count, 3)
+
+    # Only world X/Y sums and world Z minimum are needed, so skip building the
+    # full (N, 3) world array: sums are linear in the points (transform the local
+    # sum once) and Z only needs the third matrix row dotted with each point.
+    m = np.array(full_matrix, dtype=np.float64)
+    local_sum = local_points.sum(axis=0, dtype=np.float64)
+    world_sum_x, world_sum_y = m[:2, :3] @ local_sum + m[:2, 3] * count
+    world_min_z = float((local_points @ m[2, :3]).min() + m[2, 3])
 
     # Anchor in world coordinates
-    anchor_world = Vector((world_sum_x / count, world_sum_y / count, world_min_z))
+    anchor_world = Vector((float(world_sum_x) / count, float(world_sum_y) / count, world_min_z))
 
     if return_local:
         # Transform back to local if needed
@@ -222,17 +519,18 @@ def calculate_anchor_from_strokes(gp_obj, layer, frame_number, return_local=Fals
 def get_current_keyframes_set(gp_obj, settings):
     """Get a set of (layer_name, frame_number) for all current keyframes."""
     result = set()
-    
+
     if gp_obj is None or gp_obj.data is None:
         return result
-    
+
     for layer in gp_obj.data.layers:
         if layer.hide:
             continue
-        
-        for kf in layer.frames:
-            result.add((layer.name, kf.frame_number))
-    
+
+        # Read layer.name once per layer; set.update consumes the generator in C
+        layer_name = layer.name
+        result.update((layer_name, kf.frame_number) for kf in layer.frames)
+
     return result
 
 
@@ -241,53 +539,12 @@ def get_visible_keyframe(layer, current_frame):
 
     This is the keyframe at or before current_frame.
     Returns the keyframe object or None.
-    """
-    visible_kf = None
-    for kf in layer.frames:
-        if kf.frame_number <= current_frame:
-            if visible_kf is None or kf.frame_number > visible_kf.frame_number:
-                visible_kf = kf
-    return visible_kf
-
-
-def get_all_anchor_positions(gp_obj, settings):
-    """Get all anchor positions for display.
-
-    Returns list of (Vector position, bool is_current_frame).
 
-    PERFORMANCE: Uses dict lookup for layers (O(1)) instead of O(n) search per anchor.
+    PERFORMANCE: O(log K) bisect over a cached frame-number list instead of
+    walking every keyframe.
     """
-    if gp_obj is None:
-        return []
-
-    result = []
-    current_frame = bpy.context.scene.frame_current
-    anchors = get_anchors(gp_obj)
-
-    if not anchors:
-        return result
-
-    # Build layer lookup dict ONCE (O(n) instead of O(n*m))
-    layer_dict = {l.name: l for l in gp_obj.data.layers}
-
-    for layer_name, layer_anchors in anchors.items():
-        # O(1) layer lookup instead of O(n) loop
-        layer = layer_dict.get(layer_name)
-
-        if layer is None or layer.hide:
-            continue
-
-        for frame_str, anchor_data in layer_anchors.items():
-            frame = int(frame_str)
-
-            if isinstance(anchor_data, dict) and "pos" in anchor_data:
-                pos = Vector(anchor_data["pos"])
-            elif isinstance(anchor_data, list):
-                pos = Vector(anchor_data)
-            else:
-                continue
-
-            is_current = (frame == current_frame)
-            result.append((pos, is_current))
+    idx = _find_keyframe_index(layer, current_frame)
+    if idx < 0:
+        return None
+    return layer.frames[idx]
 
-    return result
@@ -2,41 +2,17 @@
 Cache management for world-space onion skinning.
 """
 
-import bisect
-from collections import OrderedDict
+import hashlib
+from collections import deque
 
 import bpy
-from mathutils import Vector
+import numpy as np
 from mathutils.geometry import tessellate_polygon
 
+from .anchors import get_visible_keyframe
 from .transforms import get_layer_transform
 
 
-def _find_active_keyframe(frames, current_frame):
-    """
-    Binary search for the active keyframe at or before current_frame.
-    Returns the keyframe object or None if no keyframe is at/before current_frame.
-    O(log n) instead of O(n) linear search.
-
-    Note: Blender keeps layer.frames sorted by frame_number internally,
-    so we skip the O(n log n) sort and just build the frame_numbers list.
-    """
-    if not frames:
-        return None
-
-    # Blender keeps frames sorted - just extract frame numbers for bisect
-    # This is O(n) list creation vs O(n log n) sorting on every call
-    frame_numbers = [kf.frame_number for kf in frames]
-
-    # Find insertion point - the index where current_frame would be inserted
-    idx = bisect.bisect_right(frame_numbers, current_frame)
-
-    # idx-1 gives us the keyframe at or before current_frame
-    if idx > 0:
-        return frames[idx - 1]
-    return None
-
-
 def get_active_gp(context):
     """Get active GP object, or None if not a GP object."""
     obj = context.active_object
@@ -49,27 +25,43 @@ def triangulate_fill(world_points):
     """
     Triangulate a polygon for fill rendering.
     Works with any polygon - Blender implicitly closes open strokes for fills.
+    world_points: (N, 3) float32 array of world-space points.
     Returns list of triangle indices [(i, j, k), ...] or empty list if not fillable.
     """
-    if len(world_points) < 3:
+    num_points = len(world_points)
+    if num_points < 3:
         return []
+    if num_points == 3:
+        # A single triangle needs no tessellation
+        return [(0, 1, 2)]
 
     try:
         # tessellate_polygon expects a list of loops (for polygons with holes)
-        # Each loop is a list of 3D points as tuples
-        poly = [[tuple(p) for p in world_points]]
-        triangles = tessellate_polygon(poly)
+        # tolist() hands it plain float lists in one C call
+        triangles = tessellate_polygon([world_points.tolist()])
         return triangles
     except Exception:
         # Triangulation can fail for degenerate polygons
         return []
 
 
-# Global cache - OrderedDict for O(1) eviction of oldest entries
+# Global cache - plain dict plus a FIFO deque of frame numbers for O(1) eviction
 # NOTE: Cache key is frame-only (not including GP object) for simplicity.
 # This is safe because handlers.py clears the cache on GP object change
 # via _last_active_gp identity check in on_depsgraph_update.
-_cache = OrderedDict()  # {frame_number: [stroke_points_list, ...]}
+_cache = {}  # {frame_number: [stroke_points_list, ...]}
+_cache_order = deque()  # Frame numbers in insertion order, oldest first
+_CACHE_MAX_SIZE = 2000
+
+# Held-drawing reuse - frames showing the same keyframes under the same transforms
+# share one stroke list (consumers must treat cached strokes as read-only)
+# Structure: {fingerprint: frame_number}
+_held_frames = {}
+
+# Union of keyframe numbers across visible layers, built lazily per GP object
+# Structure: {gp_obj.as_pointer(): frozenset(frame_number, ...)}
+# Invalidated with the keyframe cache (drawing.invalidate_keyframe_cache) and clear_cache()
+_keyframe_set_cache = {}
 
 
 def get_cache():
@@ -80,7 +72,11 @@ def get_cache():
 def clear_cache():
     """Clear all cached frames and invalidate GPU batch cache."""
     global _cache
-    _cache = OrderedDict()
+    _cache = {}
+    _cache_order.clear()
+    _held_frames.clear()
+    _clear_tri_cache()
+    invalidate_keyframe_set()
     # Also invalidate onion batch and keyframe cache since stroke data changed
     try:
         from .drawing import invalidate_onion_batch_cache, invalidate_keyframe_cache
@@ -90,9 +86,113 @@ def clear_cache():
         pass  # drawing module not loaded yet
 
 
+def invalidate_keyframe_set():
+    """Clear the visible-keyframe set cache. Call when keyframes or layer visibility change."""
+    _keyframe_set_cache.clear()
+
+
+def get_keyframe_set(gp_obj):
+    """Get the frozenset of keyframe numbers on visible layers of gp_obj."""
+    key = gp_obj.as_pointer()
+    keyframe_set = _keyframe_set_cache.get(key)
+    if keyframe_set is None:
+        keyframe_set = set()
+        for layer in gp_obj.data.layers:
+            if layer.hide:
+                continue
+            # Bulk-read frame numbers in one C call per layer
+            frames = layer.frames
+            nums = np.empty(len(frames), dtype=np.int32)
+            frames.foreach_get('frame_number', nums)
+            keyframe_set.update(nums.tolist())
+        keyframe_set = frozenset(keyframe_set)
+        _keyframe_set_cache[key] = keyframe_set
+    return keyframe_set
+
+
+# Fill triangulation cache - reuse tessellation for strokes whose world points are
+# unchanged. Held-frame reuse only covers frames where EVERY visible layer is held;
+# this still hits for a held layer while another layer changes keyframe, and for
+# the untouched strokes of a frame re-extracted after a stroke edit.
+# Structure: {(num_points, blake2b digest of the point bytes): (M, 3) uint32 index array}
+_tri_cache = {}
+_tri_cache_order = deque()  # (key, num_points) in insertion order, oldest first
+_tri_cache_points = 0  # Total stroke points across cached entries
+_tri_cache_hits = 0
+_tri_cache_misses = 0
+_TRI_CACHE_MAX_POINTS = 500_000  # Bounds memory by stroke size, not entry count
+_TRI_CACHE_MIN_POINTS = 16  # Smaller fills are cheaper to re-tessellate than to hash
+_NO_TRIANGLES = np.empty((0, 3), dtype=np.uint32)  # Shared read-only "no fill" value
+
+
+def _material_has_fill(mat):
+    """True if a GP material draws a visible fill.
+
+    Solid fills with zero alpha are treated as stroke-only so their strokes
+    skip tessellation entirely.
+    """
+    if mat is None:
+        return False
+    # GP material settings are under material.grease_pencil
+    gp_mat = mat.grease_pencil
+    if gp_mat is None or not gp_mat.show_fill:
+        return False
+    return gp_mat.fill_style != 'SOLID' or gp_mat.fill_color[3] > 0.0
+
+
+def _triangle_array(world_points):
+    """triangulate_fill() as an (M, 3) uint32 index array, out-of-range triangles dropped."""
+    triangles = triangulate_fill(world_points)
+    if not triangles:
+        return _NO_TRIANGLES
+    tris = np.array(triangles, dtype=np.uint32).reshape(-1, 3)
+    return tris[(tris < len(world_points)).all(axis=1)]
+
+
+def _clear_tri_cache():
+    """Drop all cached fill triangulations and reset their counters."""
+    global _tri_cache_points, _tri_cache_hits, _tri_cache_misses
+    _tri_cache.clear()
+    _tri_cache_order.clear()
+    _tri_cache_points = 0
+    _tri_cache_hits = 0
+    _tri_cache_misses = 0
+
+
+def _triangulate_fill_cached(world_points):
+    """_triangle_array() with results reused for byte-identical (N, 3) float32 point arrays.
+
+    Keys are a fixed-size digest, so entries never hold a copy of the points.
+    """
+    global _tri_cache_points, _tri_cache_hits, _tri_cache_misses
+    num_points = len(world_points)
+    if num_points < _TRI_CACHE_MIN_POINTS:
+        return _triangle_array(world_points)
+
+    key = (num_points, hashlib.blake2b(world_points.tobytes(), digest_size=16).digest())
+    triangles = _tri_cache.get(key)
+    if triangles is not None:
+        _tri_cache_hits += 1
+        return triangles
+
+    _tri_cache_misses += 1
+    triangles = _triangle_array(world_points)
+    _tri_cache[key] = triangles
+    _tri_cache_order.append((key, num_points))
+    _tri_cache_points += num_points
+    while _tri_cache_points > _TRI_CACHE_MAX_POINTS:
+        old_key, old_points = _tri_cache_order.popleft()
+        del _tri_cache[old_key]
+        _tri_cache_points -= old_points
+    return triangles
+
+
 def get_cache_stats():
     """Get cache statistics string."""
-    return f"{len(_cache)} frames cached"
+    lookups = _tri_cache_hits + _tri_cache_misses
+    if not lookups:
+        return f"{len(_cache)} frames cached"
+    return f"{len(_cache)} frames cached, fill reuse {_tri_cache_hits}/{lookups}"
 
 
 def extract_strokes_at_current_frame(gp_obj, settings):
@@ -105,53 +205,80 @@ def extract_strokes_at_current_frame(gp_obj, settings):
     if gp_obj is None or gp_obj.data is None:
         return strokes_data
 
-    materials = gp_obj.data.materials  # Get materials list for fill detection
+    # Hoist RNA reads out of the layer/stroke loops - they don't change per layer
+    current_frame = bpy.context.scene.frame_current
+    # Resolve material fill settings once - per-stroke check becomes a tuple index
+    fill_flags = tuple(_material_has_fill(mat) for mat in gp_obj.data.materials)
+    num_materials = len(fill_flags)
     world_matrix = gp_obj.matrix_world
 
     for layer in gp_obj.data.layers:
         if layer.hide:
             continue
-        
-        layer_matrix = get_layer_transform(layer)
-        full_matrix = world_matrix @ layer_matrix
-        
-        current_frame = bpy.context.scene.frame_current
-        # Use binary search for O(log n) keyframe lookup
-        active_kf = _find_active_keyframe(layer.frames, current_frame)
+
+        # O(log K) bisect over the layer's cached keyframe numbers
+        active_kf = get_visible_keyframe(layer, current_frame)
 
         if active_kf is None:
             continue
         
-        if active_kf.drawing is None:
-            continue
-            
         drawing = active_kf.drawing
-        
-        if not hasattr(drawing, 'attributes') or 'position' not in drawing.attributes:
+        if drawing is None:
             continue
-            
-        pos_attr = drawing.attributes['position']
-        
-        if not hasattr(drawing, 'curve_offsets'):
+
+        # One lookup per collection/attribute instead of hasattr + `in` + [] chains
+        attributes = getattr(drawing, 'attributes', None)
+        if attributes is None:
             continue
-        
-        curve_offsets = list(drawing.curve_offsets)
-        if not curve_offsets:
+
+        pos_attr = attributes.get('position')
+        if pos_attr is None:
             continue
 
-        curve_offsets_values = [co.value for co in curve_offsets]
+        curve_offsets = getattr(drawing, 'curve_offsets', None)
+        if curve_offsets is None:
+            continue
+
+        # PERFORMANCE: Bulk-read offsets and material indices with foreach_get
+        # instead of one RNA attribute access per curve
+        num_offsets = len(curve_offsets)
+        if num_offsets == 0:
+            continue
+
+        offsets = np.empty(num_offsets, dtype=np.int32)
+        curve_offsets.foreach_get('value', offsets)
+        curve_offsets_values = offsets.tolist()
         num_points = len(pos_attr.data)
 
+        # PERFORMANCE: Transform every point of the layer at once - bulk-read
+        # positions with foreach_get and apply full_matrix as one NumPy matmul,
+        # instead of a Vector allocation + Python-level matmul per point.
+        flat = np.empty(num_points * 3, dtype=np.float32)
+        pos_attr.data.foreach_get('vector', flat)
+        full_matrix = world_matrix @ get_layer_transform(layer)
+        m = np.array(full_matrix, dtype=np.float32)
+        layer_world = flat.reshape(num_points, 3) @ m[:3, :3].T
+        layer_world += m[:3, 3]  # In-place translation avoids a second (N, 3) temporary
+
         # Get material indices (CURVE domain - one per stroke)
-        if 'material_index' in drawing.attributes:
-            mat_idx_attr = drawing.attributes['material_index']
-            material_indices = [mi.value for mi in mat_idx_attr.data]
+        mat_idx_attr = attributes.get('material_index')
+        if mat_idx_attr is not None:
+            mat_idx_data = mat_idx_attr.data
+            mat_indices = np.empty(len(mat_idx_data), dtype=np.int32)
+            mat_idx_data.foreach_get('value', mat_indices)
+            material_indices = mat_indices.tolist()
         else:
             # No material_index attribute = all curves use index 0
             material_indices = [0] * len(curve_offsets_values)
 
+        # Read per-layer values once instead of per stroke
+        layer_name = layer.name
+        kf_frame_number = active_kf.frame_number
+        num_curves = len(curve_offsets_values)
+        num_mat_indices = len(material_indices)
+
         for i, start_idx in enumerate(curve_offsets_values):
-            if i + 1 < len(curve_offsets_values):
+            if i + 1 < num_curves:
                 end_idx = curve_offsets_values[i + 1]
             else:
                 end_idx = num_points
@@ -159,33 +286,24 @@ def extract_strokes_at_current_frame(gp_obj, settings):
             if start_idx >= end_idx:
                 continue
 
-            # Extract world points as tuples (not Vectors) for GPU efficiency
-            # This eliminates tuple conversion overhead during every viewport redraw
-            world_points = []
-            for p_idx in range(start_idx, end_idx):
-                local_pos = Vector(pos_attr.data[p_idx].vector)
-                world_pos = full_matrix @ local_pos
-                world_points.append((world_pos.x, world_pos.y, world_pos.z))
+            # Keep world points as a (N, 3) float32 view of the layer array - the GPU
+            # batch consumes it through the buffer protocol, no per-point conversion
+            world_points = layer_world[start_idx:end_idx]
 
             if len(world_points) >= 2:
                 # Check material fill setting (not geometric closure)
-                mat_idx = material_indices[i] if i < len(material_indices) else 0
-                has_fill = False
-                if mat_idx >= 0 and mat_idx < len(materials) and materials[mat_idx] is not None:
-                    # GP material settings are under material.grease_pencil
-                    gp_mat = materials[mat_idx].grease_pencil
-                    if gp_mat is not None:
-                        has_fill = gp_mat.show_fill
+                mat_idx = material_indices[i] if i < num_mat_indices else 0
+                has_fill = 0 <= mat_idx < num_materials and fill_flags[mat_idx]
 
                 # Triangulate if material has fill enabled
-                fill_triangles = []
+                fill_triangles = _NO_TRIANGLES
                 if has_fill and len(world_points) >= 3:
-                    fill_triangles = triangulate_fill(world_points)
+                    fill_triangles = _triangulate_fill_cached(world_points)
 
                 stroke_data = {
                     'points': world_points,
-                    'layer': layer.name,
-                    'frame': active_kf.frame_number,
+                    'layer': layer_name,
+                    'frame': kf_frame_number,
                     'fill_triangles': fill_triangles,
                 }
 
@@ -194,39 +312,74 @@ def extract_strokes_at_current_frame(gp_obj, settings):
     return strokes_data
 
 
-def cache_current_frame(gp_obj, settings):
+def _held_fingerprint(gp_obj, frame):
+    """Key for everything extract_strokes_at_current_frame reads at a frame.
+
+    Visible layers, their active keyframe and transforms, the object matrix, and
+    which materials draw a fill (toggling show_fill or fill alpha changes has_fill).
+    """
+    parts = [
+        tuple(map(tuple, gp_obj.matrix_world)),
+        tuple(_material_has_fill(mat) for mat in gp_obj.data.materials),
+    ]
+    for layer in gp_obj.data.layers:
+        if layer.hide:
+            continue
+        active_kf = get_visible_keyframe(layer, frame)
+        parts.append((
+            layer.name,
+            active_kf.frame_number if active_kf is not None else None,
+            layer.translation[:],
+            layer.rotation[:],
+            layer.scale[:],
+        ))
+    return tuple(parts)
+
+
+def invalidate_held_strokes():
+    """Stop reusing cached strokes for held drawings. Call when stroke data changes."""
+    _held_frames.clear()
+
+
+def cache_current_frame(gp_obj, settings, reuse_held=True):
     """Cache strokes for the current frame.
 
-    PERFORMANCE: In KEYFRAMES mode, uses binary search to check if current
-    frame is a keyframe, instead of O(layers × keyframes) full scan.
+    PERFORMANCE: In KEYFRAMES mode, checks the current frame against a cached
+    set of keyframe numbers - O(1), no per-layer list building on each redraw.
+    Held drawings (same keyframes and transforms as an already cached frame)
+    share that frame's stroke list instead of re-extracting every point.
+    Pass reuse_held=False right after editing strokes to force a re-extract.
     """
     global _cache
     frame = bpy.context.scene.frame_current
 
     # In KEYFRAMES mode, only cache if this is effectively a keyframe
-    if settings.mode == 'KEYFRAMES':
-        # Use binary search per layer instead of full scan
-        is_keyframe = False
-        for layer in gp_obj.data.layers:
-            if layer.hide:
-                continue
-            # Blender keeps layer.frames sorted - use binary search
-            frames = layer.frames
-            if frames:
-                # Quick check: binary search for exact frame match
-                frame_numbers = [kf.frame_number for kf in frames]
-                idx = bisect.bisect_left(frame_numbers, frame)
-                if idx < len(frame_numbers) and frame_numbers[idx] == frame:
-                    is_keyframe = True
-                    break
-
-        if not is_keyframe:
-            return
-
-    strokes = extract_strokes_at_current_frame(gp_obj, settings)
+    if settings.mode == 'KEYFRAMES' and frame not in get_keyframe_set(gp_obj):
+        return
+
+    fingerprint = _held_fingerprint(gp_obj, frame)
+    strokes = None
+    if reuse_held:
+        strokes = _cache.get(_held_frames.get(fingerprint))
+    else:
+        _held_frames.clear()  # Stroke data changed - earlier matches are stale
+
+    if strokes is None:
+        strokes = extract_strokes_at_current_frame(gp_obj, settings)
+    _held_frames[fingerprint] = frame
+    previous = _cache.get(frame)
+    if previous is None:
+        _cache_order.append(frame)
     _cache[frame] = strokes
 
-    # Limit cache size - O(1) eviction with OrderedDict
-    max_cached = 2000
-    while len(_cache) > max_cached:
-        _cache.popitem(last=False)  # Remove oldest entry (FIFO)
+    # Only this frame's onion batches were built from the replaced strokes
+    if previous is not None and previous is not strokes:
+        try:
+            from .drawing import invalidate_onion_batches_for_frames
+            invalidate_onion_batches_for_frames((frame,))
+        except ImportError:
+            pass  # drawing module not loaded yet
+
+    # Limit cache size - O(1) FIFO eviction via the order deque
+    while len(_cache) > _CACHE_MAX_SIZE:
+        _cache.pop(_cache_order.popleft(), None)
@@ -35,8 +35,12 @@ def log_onion_draw(current_frame, onion_frame, z_offset, stroke_count):
     """Log onion skin drawing event."""
     log(f"DRAW current={current_frame} onion={onion_frame} z_offset={z_offset:.4f} strokes={stroke_count}", "ONION")
 
-def log_bake(frame_count, offset_range):
-    """Log bake operation."""
+def log_bake(frame_count, offsets):
+    """Log bake operation. offsets: array of baked Z offsets (range computed here)."""
+    if len(offsets):
+        offset_range = f"min={offsets.min():.4f} max={offsets.max():.4f}"
+    else:
+        offset_range = "empty"
     log(f"BAKE frames={frame_count} offset_range={offset_range}", "BAKE")
 
 def log_cache(frame, stroke_count, is_bake_valid):
@@ -70,5 +74,16 @@ def get_log_path():
     """Return the path to the log file."""
     return _LOG_FILE
 
-# Clear log on module load
-clear_log()
+def _noop(*args, **kwargs):
+    pass
+
+if _ENABLED:
+    # Clear log on module load
+    clear_log()
+else:
+    # Disabled: swap the helpers for a no-op so the log_* helpers skip their own
+    # formatting and the log file is never touched (callers import these names
+    # after this runs). Direct log(f"...") calls still build their string -
+    # hot paths guard those with `if _ENABLED:`
+    log = log_frame_change = log_onion_draw = log_bake = log_cache = _noop
+    log_cursor = log_canvas = log_error = _noop
@@ -8,14 +8,15 @@ import math
 import blf
 import bpy
 import gpu
+import numpy as np
 from bpy_extras.view3d_utils import location_3d_to_region_2d
 from gpu_extras.batch import batch_for_shader
 from mathutils import Vector
 
-from .cache import get_cache, get_active_gp
-from .anchors import get_all_anchor_positions
-from .transforms import SURFACE_OFFSET, adjust_obj_to_surface
-from .debug_log import log, log_onion_draw, log_bake, log_cursor
+from .cache import get_cache, get_active_gp, get_keyframe_set, invalidate_keyframe_set
+from .anchors import invalidate_keyframe_index
+from .transforms import SURFACE_OFFSET, raycast_down
+from .debug_log import log, log_onion_draw, log_bake, log_cursor, _ENABLED as _LOG_ENABLED
 
 
 # Draw handler references
@@ -23,11 +24,11 @@ _draw_handler = None
 _motion_path_handler = None
 
 # Motion path cache
-_motion_path_cache = None  # List of Vector positions
+_motion_path_cache = None  # float64 (N, 3) array of path positions
 _motion_path_cache_gp = None  # GP object the cache is for
 _motion_path_dirty = True
 # Motion path GPU batch cache (avoids recreation every redraw)
-_motion_path_coords = None  # Pre-built tuple coords for GPU
+_motion_path_coords = None  # Pre-built float32 (N, 3) coords for GPU
 _motion_path_line_batch = None
 _motion_path_point_batch = None
 
@@ -41,10 +42,16 @@ _motion_path_keyframe_circles_batch = None  # Filled circles at keyframe positio
 _motion_path_inbetween_ticks_batch = None  # Perpendicular tick marks for inbetween frames (LINES)
 
 # Baked shrinkwrap data - computed ONCE when shrinkwrap enabled or animation changes
-# Structure: {frame: {'z_offset': float, 'normal': (x, y, z)}}
+# Structure: float32 array (num_frames, 4), row = frame - _baked_start_frame,
+# columns = (z_offset, normal_x, normal_y, normal_z)
 # v9.5: Now stores surface normal for normal-based offset (wall runs, ceilings, etc.)
-_baked_shrinkwrap_data = {}
+# PERFORMANCE: Contiguous rows + base frame - driver lookups are a bounds check and
+# an array load instead of a dict probe plus nested dict reads
+_BAKED_EMPTY = np.empty((0, 4), dtype=np.float32)
+_baked_shrinkwrap_data = _BAKED_EMPTY
+_baked_start_frame = 0
 _baked_offset_valid = False  # True after successful bake
+_baked_generation = 0  # Bumped on every bake - lets dependents detect replaced data
 
 # v9.3: Context-aware driver management
 # Driver setup can only happen in safe contexts (UI callbacks, operators, file load)
@@ -53,18 +60,25 @@ _driver_setup_pending = False  # True if driver needs setup from next safe conte
 _bake_in_progress = False  # Guard against overlapping bakes
 
 # Onion skin GPU batch cache - CRITICAL for performance near camera
-# Structure: {(frame, offset, normal): {'fill_batches': [batch, ...], 'stroke_batches': [batch, ...]}}
-# Batches are keyed by (frame, offset, normal) and built once, reused on every redraw
+# Structure: {frame: {'fill_batches': [batch, ...], 'stroke_batches': [batch, ...],
+#                     'base_coords': (N, 3) float32, 'line_indices': (S, 2) uint32,
+#                     'tri_indices': (T, 3) uint32 or None, 'offset_version': int}}
+# Batches are keyed by frame and built once, reused on every redraw
 # v9.4: Added size limit to prevent unbounded memory growth
-# v9.5: Cache key now includes surface normal for normal-based offset
+# A frame's offset and normal are fixed by surface_offset and the bake. When either
+# changes, _onion_offset_version is bumped and stale entries get fresh GPU buffers
+# from their kept coords/indices (Python-created vertex buffers are static - they
+# cannot be refilled once drawn)
 _onion_batch_cache = {}
 _onion_cache_surface_offset = None  # Track surface_offset to detect changes
 _onion_cache_gp = None  # Track GP object to detect changes
+_onion_cache_bake_state = None  # Track bake generation (or -1 when unused) to detect changes
+_onion_offset_version = 0  # Bumped when surface_offset or the bake changes
 _ONION_CACHE_MAX_SIZE = 100  # Maximum number of cached batch entries (FIFO eviction)
 
 # Keyframe list cache - avoid recomputing sorted keyframes on every draw
 # Invalidated when GP object changes or onion batch cache is cleared
-_keyframe_cache = None  # Sorted list of keyframe numbers
+_keyframe_cache = None  # Sorted int32 array of keyframe numbers
 _keyframe_cache_gp = None  # GP object the cache is for
 
 
@@ -94,6 +108,9 @@ def _get_fill_shader():
 # Point shader for POINTS primitive
 _point_shader = None
 
+# Vertex format for onion skin buffers (single float32 vec3 "pos" attribute)
+_pos_format = None
+
 
 def _get_point_shader():
     """Get cached POINT_UNIFORM_COLOR shader for drawing points."""
@@ -103,11 +120,24 @@ def _get_point_shader():
     return _point_shader
 
 
+def _get_pos_format():
+    """Get cached GPUVertFormat with one vec3 float32 "pos" attribute."""
+    global _pos_format
+    if _pos_format is None:
+        _pos_format = gpu.types.GPUVertFormat()
+        _pos_format.attr_add(id="pos", comp_type='F32', len=3, fetch_mode='FLOAT')
+    return _pos_format
+
+
 def invalidate_motion_path():
     """Mark motion path cache as dirty, triggering rebuild on next draw."""
     global _motion_path_dirty, _motion_path_line_batch, _motion_path_point_batch, _motion_path_coords
     global _motion_path_arrows_batch, _motion_path_keyframe_data
     global _motion_path_keyframe_circles_batch, _motion_path_inbetween_ticks_batch
+    # Handlers and property updates fire in bursts - nothing to drop if a rebuild
+    # is already pending and the batches are gone
+    if _motion_path_dirty and _motion_path_line_batch is None:
+        return
     _motion_path_dirty = True
     # Also invalidate GPU batch cache
     _motion_path_line_batch = None
@@ -127,10 +157,23 @@ def invalidate_onion_batch_cache():
     PERFORMANCE (P7): Does NOT clear keyframe cache.
     Call invalidate_keyframe_cache() separately when keyframes change.
     """
-    global _onion_batch_cache, _onion_cache_surface_offset, _onion_cache_gp
+    global _onion_batch_cache, _onion_cache_surface_offset, _onion_cache_gp, _onion_cache_bake_state
+    if not _onion_batch_cache and _onion_cache_gp is None:
+        return  # Already cleared since the last draw
     _onion_batch_cache = {}
     _onion_cache_surface_offset = None
     _onion_cache_gp = None
+    _onion_cache_bake_state = None
+
+
+def invalidate_onion_batches_for_frames(frames):
+    """Drop cached onion batches for the given frames only.
+
+    Batches are built from the per-frame stroke cache, so a frame whose stroke
+    list was replaced needs a rebuild while every other frame stays valid.
+    """
+    for frame in frames:
+        _onion_batch_cache.pop(frame, None)
 
 
 def invalidate_keyframe_cache():
@@ -138,12 +181,29 @@ def invalidate_keyframe_cache():
     global _keyframe_cache, _keyframe_cache_gp
     _keyframe_cache = None
     _keyframe_cache_gp = None
+    invalidate_keyframe_set()
+    # Per-layer frame lists are keyed by layer pointer - drop them so removed layers
+    # don't linger and a new layer at a reused address starts fresh
+    invalidate_keyframe_index()
 
 
 def invalidate_baked_offsets():
     """Mark baked offsets as invalid, requiring re-bake."""
     global _baked_offset_valid
+    if not _baked_offset_valid:
+        return  # Drivers already publish the unbaked fallbacks
     _baked_offset_valid = False
+    register_driver_namespace()  # Drivers fall back to unbaked values
+
+
+def _baked_row(frame):
+    """Row index of frame in _baked_shrinkwrap_data, or -1 if not baked."""
+    if not _baked_offset_valid:
+        return -1
+    i = int(frame) - _baked_start_frame
+    if 0 <= i < len(_baked_shrinkwrap_data):
+        return i
+    return -1
 
 
 def get_baked_offset(frame):
@@ -151,12 +211,10 @@ def get_baked_offset(frame):
     Get pre-baked shrinkwrap Z offset for a frame.
     Returns offset value, or None if not baked.
     """
-    if not _baked_offset_valid:
+    i = _baked_row(frame)
+    if i < 0:
         return None
-    data = _baked_shrinkwrap_data.get(int(frame))
-    if data is None:
-        return None
-    return data.get('z_offset', 0.0)
+    return float(_baked_shrinkwrap_data[i, 0])
 
 
 def get_baked_data(frame):
@@ -166,9 +224,28 @@ def get_baked_data(frame):
 
     Returns dict with 'z_offset' and 'normal' keys, or None if not baked.
     """
-    if not _baked_offset_valid:
+    i = _baked_row(frame)
+    if i < 0:
         return None
-    return _baked_shrinkwrap_data.get(int(frame))
+    z_offset, nx, ny, nz = _baked_shrinkwrap_data[i].tolist()
+    return {'z_offset': z_offset, 'normal': (nx, ny, nz)}
+
+
+def get_baked_data_bulk(frames):
+    """
+    Gather baked shrinkwrap rows for many frames in one indexed read.
+
+    Returns (rows, found): rows is a float32 (N, 4) array of
+    (z_offset, normal_x, normal_y, normal_z), found is a bool mask of the
+    frames that have baked data. Rows where found is False are zeros.
+    """
+    idx = np.asarray(frames, dtype=np.int64) - _baked_start_frame
+    found = (idx >= 0) & (idx < len(_baked_shrinkwrap_data))
+    if not _baked_offset_valid or not found.any():
+        return np.zeros((len(idx), 4), dtype=np.float32), np.zeros(len(idx), dtype=bool)
+    rows = _baked_shrinkwrap_data[np.where(found, idx, 0)]
+    rows[~found] = 0.0
+    return rows, found
 
 
 def is_bake_valid():
@@ -228,66 +305,73 @@ def complete_pending_driver_setup(gp_obj):
 # Clean timeline, reliable offset application.
 # ============================================================================
 
-def _get_shrinkwrap_offset_for_driver(frame):
+def _build_driver_lookups():
     """
-    Driver namespace function - called by driver expression.
-    Returns the baked Z offset for the given frame.
-    This is registered in bpy.app.driver_namespace["shrinkwrap_offset"].
+    Build the driver namespace functions, specialized to the current bake.
+
+    PERFORMANCE: Drivers evaluate these every frame of playback. Each function
+    binds the baked rows (as plain float lists), start frame and row count as
+    default arguments, so a lookup is local loads plus one list index - no
+    module global reads or NumPy scalar conversion. Rebuilt by
+    register_driver_namespace() whenever the bake changes.
     """
-    if not _baked_offset_valid:
+    rows = _baked_shrinkwrap_data.tolist() if _baked_offset_valid else []
+    start = _baked_start_frame
+    count = len(rows)
+
+    def shrinkwrap_offset(frame, rows=rows, start=start, count=count):
+        """Return the baked Z offset for the given frame."""
+        i = int(frame) - start
+        if 0 <= i < count:
+            return rows[i][0]
         return 0.0
-    data = _baked_shrinkwrap_data.get(int(frame))
-    if data is None:
-        return 0.0
-    return data.get('z_offset', 0.0)
-
 
-# v9.5: Surface Normal offset driver functions
-# These return the offset component for each axis based on surface normal
-def _get_surface_offset_x(frame, magnitude):
-    """Return X component of surface normal offset."""
-    if not _baked_offset_valid or magnitude == 0:
-        return 0.0
-    data = _baked_shrinkwrap_data.get(int(frame))
-    if data is None or 'normal' not in data:
+    # v9.5: Surface Normal offset driver functions
+    # These return the offset component for each axis based on surface normal
+    def surface_offset_x(frame, magnitude, rows=rows, start=start, count=count):
+        """Return X component of surface normal offset."""
+        if magnitude == 0:
+            return 0.0
+        i = int(frame) - start
+        if 0 <= i < count:
+            return rows[i][1] * magnitude
         return 0.0
-    return data['normal'][0] * magnitude
 
-
-def _get_surface_offset_y(frame, magnitude):
-    """Return Y component of surface normal offset."""
-    if not _baked_offset_valid or magnitude == 0:
-        return 0.0
-    data = _baked_shrinkwrap_data.get(int(frame))
-    if data is None or 'normal' not in data:
+    def surface_offset_y(frame, magnitude, rows=rows, start=start, count=count):
+        """Return Y component of surface normal offset."""
+        if magnitude == 0:
+            return 0.0
+        i = int(frame) - start
+        if 0 <= i < count:
+            return rows[i][2] * magnitude
         return 0.0
-    return data['normal'][1] * magnitude
 
+    def surface_offset_z(frame, magnitude, rows=rows, start=start, count=count):
+        """
+        Return Z component: shrinkwrap offset + surface normal offset.
+        Combines both effects for proper surface tracking.
+        """
+        i = int(frame) - start
+        if 0 <= i < count:
+            row = rows[i]
+            return row[0] + row[3] * magnitude
+        return magnitude  # Fallback: full offset on Z when no bake or no data
 
-def _get_surface_offset_z(frame, magnitude):
-    """
-    Return Z component: shrinkwrap offset + surface normal offset.
-    Combines both effects for proper surface tracking.
-    """
-    if not _baked_offset_valid:
-        return magnitude  # Fallback: full offset on Z when no bake
-    data = _baked_shrinkwrap_data.get(int(frame))
-    if data is None:
-        return magnitude  # Fallback: full offset on Z when no data
-    z_offset = data.get('z_offset', 0.0)
-    normal = data.get('normal')
-    if normal is None:
-        return z_offset + magnitude  # Shrinkwrap + fallback Z
-    return z_offset + normal[2] * magnitude
+    return {
+        "shrinkwrap_offset": shrinkwrap_offset,
+        "surface_offset_x": surface_offset_x,
+        "surface_offset_y": surface_offset_y,
+        "surface_offset_z": surface_offset_z,
+    }
 
 
 def register_driver_namespace():
-    """Register our lookup functions in the driver namespace."""
-    bpy.app.driver_namespace["shrinkwrap_offset"] = _get_shrinkwrap_offset_for_driver
-    # v9.5: Surface normal offset functions for XYZ drivers
-    bpy.app.driver_namespace["surface_offset_x"] = _get_surface_offset_x
-    bpy.app.driver_namespace["surface_offset_y"] = _get_surface_offset_y
-    bpy.app.driver_namespace["surface_offset_z"] = _get_surface_offset_z
+    """Register our lookup functions in the driver namespace.
+
+    Called at load and again after every bake or invalidation so the
+    registered functions see the current baked data.
+    """
+    bpy.app.driver_namespace.update(_build_driver_lookups())
 
 
 def unregister_driver_namespace():
@@ -314,11 +398,7 @@ def _setup_shrinkwrap_driver(gp_obj):
     complete_pending_driver_setup). No deferred timer - we use pending flag instead.
     """
     # Remove existing drivers if present (avoid duplicates)
-    for axis_idx in (0, 1, 2):  # X, Y, Z
-        try:
-            gp_obj.driver_remove("delta_location", axis_idx)
-        except RuntimeError:
-            pass  # No driver existed
+    _remove_delta_location_drivers(gp_obj)
 
     # NOTE: Namespace functions should be registered at addon load time
     # (in __init__.py register()), not here. But ensure they exist as safety.
@@ -360,6 +440,20 @@ def _setup_shrinkwrap_driver(gp_obj):
     log("Setup drivers on delta_location.xyz with surface normal offset", "BAKE")
 
 
+def _remove_delta_location_drivers(gp_obj):
+    """Remove whichever delta_location X/Y/Z drivers exist on gp_obj.
+
+    Probes animation_data.drivers first instead of relying on driver_remove
+    raising for axes that have no driver.
+    """
+    if gp_obj.animation_data is None:
+        return
+    axes = [fc.array_index for fc in gp_obj.animation_data.drivers
+            if fc.data_path == "delta_location" and fc.array_index in (0, 1, 2)]
+    for axis_idx in axes:
+        gp_obj.driver_remove("delta_location", axis_idx)
+
+
 def _has_shrinkwrap_driver(gp_obj):
     """
     Check if shrinkwrap/surface offset drivers exist on delta_location.
@@ -386,7 +480,7 @@ def ensure_shrinkwrap_valid(gp_obj, settings, scene):
     operators, file load).
 
     This function only validates and fixes:
-      - _baked_shrinkwrap_offsets dict (populated)
+      - _baked_shrinkwrap_data array (populated)
       - _baked_offset_valid flag (True)
       - Namespace function (registered)
 
@@ -430,11 +524,7 @@ def remove_shrinkwrap_driver(gp_obj):
         return
 
     # Remove all three axis drivers
-    for axis_idx in (0, 1, 2):
-        try:
-            gp_obj.driver_remove("delta_location", axis_idx)
-        except RuntimeError:
-            pass  # Driver didn't exist
+    _remove_delta_location_drivers(gp_obj)
 
     log("Removed surface offset drivers from delta_location.xyz", "BAKE")
 
@@ -468,7 +558,8 @@ def bake_shrinkwrap_offsets(gp_obj, settings, scene, setup_driver=True):
     unsafe, driver setup is marked as pending and will be completed from the
     next safe context (UI callback, operator, or when playback stops).
     """
-    global _baked_shrinkwrap_data, _baked_offset_valid, _bake_in_progress, _driver_setup_pending
+    global _baked_shrinkwrap_data, _baked_start_frame, _baked_offset_valid, _bake_in_progress, _driver_setup_pending
+    global _baked_generation
 
     # Guard against overlapping bakes (can happen with nested handler calls)
     if _bake_in_progress:
@@ -478,8 +569,9 @@ def bake_shrinkwrap_offsets(gp_obj, settings, scene, setup_driver=True):
     _bake_in_progress = True
 
     try:
-        _baked_shrinkwrap_data = {}
+        _baked_shrinkwrap_data = _BAKED_EMPTY
         _baked_offset_valid = False
+        _baked_generation += 1
 
         if not gp_obj:
             return 0
@@ -488,7 +580,8 @@ def bake_shrinkwrap_offsets(gp_obj, settings, scene, setup_driver=True):
             # No animation - just compute current frame offset
             data = _compute_single_frame_offset(gp_obj, scene, scene.frame_current)
             if data is not None:
-                _baked_shrinkwrap_data[scene.frame_current] = data
+                _baked_shrinkwrap_data = np.array([(data['z_offset'], *data['normal'])], dtype=np.float32)
+                _baked_start_frame = scene.frame_current
                 _baked_offset_valid = True
             # Still need driver setup for single-frame case
             if setup_driver:
@@ -513,57 +606,61 @@ def bake_shrinkwrap_offsets(gp_obj, settings, scene, setup_driver=True):
         except (RuntimeError, AttributeError):
             return 0
 
-        count = 0
-        for frame in range(start_frame, end_frame + 1):
-            # Evaluate F-curve position
-            x = fc_x.evaluate(frame)
-            y = fc_y.evaluate(frame)
-            z = fc_z.evaluate(frame)
-
-            # Raycast down to find mesh surface
-            ray_origin = Vector((x, y, z + 1000.0))
-            ray_dir = Vector((0, 0, -1))
-
-            try:
-                hit, location, normal, index, hit_obj, matrix = scene.ray_cast(
-                    depsgraph, ray_origin, ray_dir
-                )
-
-                if hit and hit_obj != gp_obj:
-                    # Offset = mesh_z - fcurve_z + small surface offset
-                    # Minimum Z mode: only push UP, never down (preserves jump animations)
-                    offset = max(0, (location.z + SURFACE_OFFSET) - z)
-                    # v9.5: Store both z_offset AND surface normal
-                    _baked_shrinkwrap_data[frame] = {
-                        'z_offset': offset,
-                        'normal': (normal.x, normal.y, normal.z)
-                    }
-                else:
-                    # No mesh below - zero offset, default up normal
-                    _baked_shrinkwrap_data[frame] = {
-                        'z_offset': 0.0,
-                        'normal': (0.0, 0.0, 1.0)  # Default to global Z up
-                    }
-            except (RuntimeError, AttributeError):
-                _baked_shrinkwrap_data[frame] = {
-                    'z_offset': 0.0,
-                    'normal': (0.0, 0.0, 1.0)
-                }
+        # PERFORMANCE: Sample the location curves for the whole range up front and
+        # raycast with plain floats - no per-frame Vector construction
+        frames = range(start_frame, end_frame + 1)
+        num_frames = len(frames)
+        xs = np.fromiter((fc_x.evaluate(f) for f in frames), dtype=np.float64, count=num_frames)
+        ys = np.fromiter((fc_y.evaluate(f) for f in frames), dtype=np.float64, count=num_frames)
+        zs = np.fromiter((fc_z.evaluate(f) for f in frames), dtype=np.float64, count=num_frames)
+
+        # Default row: zero offset, global Z up normal (no mesh below / raycast failed)
+        baked = np.zeros((num_frames, 4), dtype=np.float32)
+        baked[:, 3] = 1.0
+
+        # PERFORMANCE: Held poses and step keys leave (x, y) unchanged between frames,
+        # and a vertical ray only depends on (x, y) - raycast once per plateau
+        moved = np.ones(num_frames, dtype=bool)
+        moved[1:] = (np.abs(np.diff(xs)) >= 1e-4) | (np.abs(np.diff(ys)) >= 1e-4)
+
+        hit_mask = np.zeros(num_frames, dtype=bool)
+        hit_z = np.empty(num_frames)
+        normals = np.empty((num_frames, 3))
+        result = None
+        # Rays are only reused within this bake - the scene may change before the next
+        ray_cache = {}
+        # Preconditions (depsgraph, F-curves) are checked above, so a ray_cast error
+        # means the scene itself is unusable - stop the loop once rather than
+        # wrapping every ray in try/except; remaining frames keep the default row
+        try:
+            for i, (x, y, z, ray_needed) in enumerate(zip(xs.tolist(), ys.tolist(), zs.tolist(), moved.tolist())):
+                if ray_needed:
+                    # Raycast down to find mesh surface
+                    result = raycast_down(scene, depsgraph, x, y, z, gp_obj, ray_cache)
+                if result is not None:
+                    hit_mask[i] = True
+                    hit_z[i], normals[i] = result
+                # else: No mesh below - keep the default row
+        except (RuntimeError, AttributeError):
+            log("Raycast failed during bake - remaining frames keep default offset", "BAKE")
 
-            count += 1
+        # Offset = mesh_z - fcurve_z + small surface offset
+        # Minimum Z mode: only push UP, never down (preserves jump animations)
+        baked[hit_mask, 0] = np.maximum(0.0, hit_z[hit_mask] + SURFACE_OFFSET - zs[hit_mask])
+        # v9.5: Store both z_offset AND surface normal
+        baked[hit_mask, 1:] = normals[hit_mask]
+        count = num_frames
 
+        _baked_shrinkwrap_data = baked
+        _baked_start_frame = start_frame
         _baked_offset_valid = True
 
         # Also invalidate motion path so it rebuilds with baked offsets
         invalidate_motion_path()
 
-        # DEBUG: Log bake results
-        if _baked_shrinkwrap_data:
-            offsets = [d['z_offset'] for d in _baked_shrinkwrap_data.values()]
-            offset_range = f"min={min(offsets):.4f} max={max(offsets):.4f}"
-        else:
-            offset_range = "empty"
-        log_bake(count, offset_range)
+        # DEBUG: Log bake results - the min/max pass lives in log_bake, so it is
+        # skipped entirely when logging is disabled
+        log_bake(count, _baked_shrinkwrap_data[:, 0])
 
         # v9.3: Context-aware driver setup
         if setup_driver:
@@ -573,6 +670,8 @@ def bake_shrinkwrap_offsets(gp_obj, settings, scene, setup_driver=True):
 
     finally:
         _bake_in_progress = False
+        # Re-specialize the driver functions to the new bake (or its absence)
+        register_driver_namespace()
 
 
 def _handle_driver_setup(gp_obj):
@@ -602,19 +701,15 @@ def _compute_single_frame_offset(gp_obj, scene, frame):
     except (RuntimeError, AttributeError):
         return None
 
-    pos = gp_obj.location.copy()
-
-    ray_origin = Vector((pos.x, pos.y, pos.z + 1000.0))
-    ray_dir = Vector((0, 0, -1))
+    pos = gp_obj.location
 
     try:
-        hit, location, normal, index, hit_obj, matrix = scene.ray_cast(
-            depsgraph, ray_origin, ray_dir
-        )
-        if hit and hit_obj != gp_obj:
+        result = raycast_down(scene, depsgraph, pos.x, pos.y, pos.z, gp_obj)
+        if result is not None:
+            hit_z, normal = result
             return {
-                'z_offset': (location.z + SURFACE_OFFSET) - pos.z,
-                'normal': (normal.x, normal.y, normal.z)
+                'z_offset': (hit_z + SURFACE_OFFSET) - pos.z,
+                'normal': normal
             }
     except (RuntimeError, AttributeError):
         pass
@@ -772,7 +867,13 @@ def _extract_keyframe_data(gp_obj, fc_x, fc_y, fc_z, settings):
     # Get all keyframe frame numbers
     keyframe_frames = sorted(set(int(kp.co[0]) for kp in fc_x.keyframe_points))
 
-    for frame in keyframe_frames:
+    # Gather baked rows for every keyframe at once instead of a lookup per frame
+    if depth_enabled:
+        baked_rows, baked_found = get_baked_data_bulk(keyframe_frames)
+        baked_rows = baked_rows.tolist()
+        baked_found = baked_found.tolist()
+
+    for i, frame in enumerate(keyframe_frames):
         # Sample position at keyframe
         x = fc_x.evaluate(frame)
         y = fc_y.evaluate(frame)
@@ -781,16 +882,14 @@ def _extract_keyframe_data(gp_obj, fc_x, fc_y, fc_z, settings):
 
         # v9.5: Apply shrinkwrap offset + surface normal offset if enabled
         if depth_enabled:
-            baked_data = get_baked_data(frame)
-            if baked_data is not None:
-                pos.z += baked_data.get('z_offset', 0.0)
+            if baked_found[i]:
+                z_offset, nx, ny, nz = baked_rows[i]
+                pos.z += z_offset
                 # Apply surface_offset along normal
                 if offset_magnitude > 0:
-                    normal = baked_data.get('normal')
-                    if normal:
-                        pos.x += normal[0] * offset_magnitude
-                        pos.y += normal[1] * offset_magnitude
-                        pos.z += normal[2] * offset_magnitude
+                    pos.x += nx * offset_magnitude
+                    pos.y += ny * offset_magnitude
+                    pos.z += nz * offset_magnitude
         elif offset_magnitude > 0:
             # Fallback: global Z offset when shrinkwrap disabled
             pos.z += offset_magnitude
@@ -817,49 +916,95 @@ def get_draw_handlers():
     return _draw_handler
 
 
-def _build_onion_batches_for_frame(frame, strokes, offset_magnitude, normal, fill_shader, stroke_shader):
+def _offset_coords(base_coords, offset_magnitude, normal):
+    """Apply the onion offset along the surface normal (v9.5) - one broadcast add.
+
+    Returns base_coords itself when there is no offset (callers only read it).
+    """
+    if offset_magnitude > 0:
+        # Fallback: global Z offset when no normal available
+        direction = normal if normal else (0.0, 0.0, 1.0)
+        return base_coords + np.array(direction, dtype=np.float32) * offset_magnitude
+    return base_coords
+
+
+def _build_onion_batches_for_frame(frame, strokes, offset_magnitude, normal):
     """
     Build and cache GPU batches for a single onion skin frame.
-    Returns dict with 'fill_batches' and 'stroke_batches' lists.
+    Returns dict with 'fill_batches' and 'stroke_batches' lists, plus the
+    un-offset 'base_coords' and index arrays used by _rebuild_onion_batches().
 
     v9.5: Now takes offset_magnitude and surface normal.
     Offset is applied along the normal direction (supports walls, ceilings, etc.)
+
+    PERFORMANCE: All strokes of the frame share one vertex buffer, drawn as one
+    indexed LINES batch plus one indexed TRIS batch for fills - two draw calls
+    per frame instead of one or two per stroke. The lists hold at most one batch.
+    Coords and indices are kept so offset changes skip re-gathering the strokes.
     """
-    fill_batches = []
-    stroke_batches = []
+    entry = {'fill_batches': [], 'stroke_batches': [],
+             'base_coords': None, 'line_indices': None, 'tri_indices': None}
+
+    point_chunks = []  # Per-stroke (N, 3) float32 arrays
+    tri_chunks = []    # Per-stroke (T, 3) fill indices into the shared buffer
+    base = 0
 
     for stroke_data in strokes:
-        points = stroke_data.get('points')
-        if not points or len(points) < 2:
+        points = stroke_data.get('points')  # (N, 3) float32 array
+        if points is None or len(points) < 2:
             continue
 
-        # Apply offset along surface normal (v9.5)
-        if normal and offset_magnitude > 0:
-            nx, ny, nz = normal
-            coords = [(p[0] + nx * offset_magnitude,
-                       p[1] + ny * offset_magnitude,
-                       p[2] + nz * offset_magnitude) for p in points]
-        elif offset_magnitude > 0:
-            # Fallback: global Z offset when no normal available
-            coords = [(p[0], p[1], p[2] + offset_magnitude) for p in points]
-        else:
-            # No offset
-            coords = list(points)
+        num_points = len(points)
+
+        # Fill triangles index the stroke's own points - rebase onto the shared buffer
+        # (already a validated (M, 3) uint32 array from extraction)
+        fill_triangles = stroke_data.get('fill_triangles')
+        if fill_triangles is not None and len(fill_triangles):
+            tri_chunks.append(fill_triangles + base)
+
+        point_chunks.append(points)
+        base += num_points
+
+    if not point_chunks:
+        return entry
+
+    base_coords = np.concatenate(point_chunks)
+
+    # Segment indices for every stroke at once: consecutive vertex pairs across the
+    # shared buffer, minus the pairs that would bridge one stroke's end to the next
+    stroke_starts = np.cumsum([len(points) for points in point_chunks[:-1]], dtype=np.intp)
+    segment_starts = np.delete(np.arange(base - 1, dtype=np.uint32), stroke_starts - 1)
+    line_indices = np.column_stack((segment_starts, segment_starts + 1))
+
+    entry['base_coords'] = base_coords
+    entry['line_indices'] = line_indices
+    entry['tri_indices'] = np.concatenate(tri_chunks) if tri_chunks else None
+    _rebuild_onion_batches(entry, offset_magnitude, normal)
+    return entry
+
 
-        # Build fill batch if has fill triangles
-        fill_triangles = stroke_data.get('fill_triangles', [])
-        if fill_triangles:
-            tri_coords = []
-            for i, j, k in fill_triangles:
-                if i < len(coords) and j < len(coords) and k < len(coords):
-                    tri_coords.extend([coords[i], coords[j], coords[k]])
-            if tri_coords:
-                fill_batches.append(batch_for_shader(fill_shader, 'TRIS', {"pos": tri_coords}))
+def _rebuild_onion_batches(entry, offset_magnitude, normal):
+    """Create fresh GPU buffers and batches for a cached frame at a new offset.
 
-        # Build stroke batch
-        stroke_batches.append(batch_for_shader(stroke_shader, 'LINE_STRIP', {"pos": coords}))
+    Always allocates a new vertex buffer - one that has been drawn is static and
+    cannot be refilled with attr_fill.
+    """
+    fill_batches = []
+    stroke_batches = []
+    base_coords = entry['base_coords']
+    if base_coords is not None:
+        vbo = gpu.types.GPUVertBuf(_get_pos_format(), len(base_coords))
+        vbo.attr_fill("pos", _offset_coords(base_coords, offset_magnitude, normal))
 
-    return {'fill_batches': fill_batches, 'stroke_batches': stroke_batches}
+        if entry['tri_indices'] is not None:
+            ibo = gpu.types.GPUIndexBuf(type='TRIS', seq=entry['tri_indices'])
+            fill_batches.append(gpu.types.GPUBatch(type='TRIS', buf=vbo, elem=ibo))
+
+        ibo = gpu.types.GPUIndexBuf(type='LINES', seq=entry['line_indices'])
+        stroke_batches.append(gpu.types.GPUBatch(type='LINES', buf=vbo, elem=ibo))
+
+    entry['fill_batches'] = fill_batches
+    entry['stroke_batches'] = stroke_batches
 
 
 def draw_onion_callback():
@@ -868,10 +1013,12 @@ def draw_onion_callback():
     Called every viewport redraw.
 
     PERFORMANCE: Uses batch caching to avoid recreating GPU geometry every frame.
-    Batches are cached per (frame, offset, normal) and only rebuilt when data changes.
+    Batches are cached per frame and only rebuilt when data changes - on a cache
+    hit no baked offset lookup or key construction happens at all.
     v9.5: Offset is now applied along surface normal when shrinkwrap is enabled.
     """
-    global _onion_batch_cache, _onion_cache_surface_offset, _onion_cache_gp
+    global _onion_batch_cache, _onion_cache_surface_offset, _onion_cache_gp, _onion_cache_bake_state
+    global _onion_offset_version
 
     try:
         scene = bpy.context.scene
@@ -905,18 +1052,26 @@ def draw_onion_callback():
         return
 
     # Check if GP object changed -> invalidate batch cache
-    if _onion_cache_gp != gp_obj:
+    if _onion_cache_gp is not gp_obj:  # Identity check (P8)
         _onion_batch_cache = {}
         _onion_cache_gp = gp_obj
 
     # v9.5: Get surface_offset magnitude (used with surface normal direction)
     base_offset = settings.surface_offset if settings.surface_offset > 0 else 0.0
 
-    # Check if offset settings changed -> invalidate batch cache
+    # Check if offset settings changed -> stale frames get new GPU buffers
     if _onion_cache_surface_offset != base_offset:
-        _onion_batch_cache = {}
+        _onion_offset_version += 1
         _onion_cache_surface_offset = base_offset
 
+    # Check if baked offsets were replaced or toggled -> stale frames get new GPU buffers
+    depth_enabled = settings.depth_interaction_enabled
+    bake_valid = is_bake_valid() if depth_enabled else False
+    bake_state = _baked_generation if bake_valid else -1
+    if _onion_cache_bake_state != bake_state:
+        _onion_offset_version += 1
+        _onion_cache_bake_state = bake_state
+
     # Set up GPU state
     stroke_shader = _get_stroke_shader()
     fill_shader = _get_fill_shader()
@@ -939,8 +1094,6 @@ def draw_onion_callback():
         draw_data = []  # List of (cached_batches, fill_color, stroke_color)
 
         # Cache common settings lookups
-        depth_enabled = settings.depth_interaction_enabled
-        bake_valid = is_bake_valid() if depth_enabled else False
         color_before = settings.color_before
         color_after = settings.color_after
         fill_opacity = settings.fill_opacity
@@ -956,31 +1109,29 @@ def draw_onion_callback():
             if not strokes:
                 continue
 
-            # v9.5: Get baked data (z_offset + surface normal) for this frame
-            normal = None
-            total_offset = base_offset
-            if depth_enabled and bake_valid:
-                baked_data = get_baked_data(frame)
-                if baked_data is not None:
-                    total_offset += baked_data.get('z_offset', 0.0)
-                    normal = baked_data.get('normal')
-
-            # v9.5: Cache key includes frame, offset magnitude, and normal
-            # Normal tuple makes unique keys for different surface orientations
-            normal_key = normal if normal else (0.0, 0.0, 1.0)
-            cache_key = (frame, round(total_offset, 4), normal_key)
-
             # Get or build cached batches
-            if cache_key not in _onion_batch_cache:
-                _onion_batch_cache[cache_key] = _build_onion_batches_for_frame(
-                    frame, strokes, total_offset, normal, fill_shader, stroke_shader
-                )
-                # v9.4: FIFO eviction to prevent unbounded cache growth
-                while len(_onion_batch_cache) > _ONION_CACHE_MAX_SIZE:
-                    oldest_key = next(iter(_onion_batch_cache))
-                    del _onion_batch_cache[oldest_key]
-
-            cached_batches = _onion_batch_cache[cache_key]
+            cached_batches = _onion_batch_cache.get(frame)
+            if cached_batches is None or cached_batches['offset_version'] != _onion_offset_version:
+                # v9.5: Get baked data (z_offset + surface normal) for this frame
+                normal = None
+                total_offset = base_offset
+                i = _baked_row(frame) if bake_valid else -1
+                if i >= 0:
+                    z_offset, nx, ny, nz = _baked_shrinkwrap_data[i].tolist()
+                    total_offset += z_offset
+                    normal = (nx, ny, nz)
+
+                if cached_batches is None:
+                    cached_batches = _build_onion_batches_for_frame(frame, strokes, total_offset, normal)
+                    _onion_batch_cache[frame] = cached_batches
+                    # v9.4: FIFO eviction to prevent unbounded cache growth
+                    while len(_onion_batch_cache) > _ONION_CACHE_MAX_SIZE:
+                        oldest_key = next(iter(_onion_batch_cache))
+                        del _onion_batch_cache[oldest_key]
+                else:
+                    # Offset changed - same geometry, new GPU buffers from the kept arrays
+                    _rebuild_onion_batches(cached_batches, total_offset, normal)
+                cached_batches['offset_version'] = _onion_offset_version
 
             # Calculate colors
             base_color = color_before if frame < current_frame else color_after
@@ -994,10 +1145,14 @@ def draw_onion_callback():
             draw_data.append((cached_batches, fill_color, stroke_color))
 
         # PASS 1: Draw all fills (bind shader ONCE)
+        # Colors repeat across frames (e.g. no falloff) - only upload on change
         fill_shader.bind()
+        last_color = None
         for cached_batches, fill_color, _ in draw_data:
             if cached_batches['fill_batches']:
-                fill_shader.uniform_float("color", fill_color)
+                if fill_color != last_color:
+                    fill_shader.uniform_float("color", fill_color)
+                    last_color = fill_color
                 for batch in cached_batches['fill_batches']:
                     batch.draw(fill_shader)
 
@@ -1005,9 +1160,12 @@ def draw_onion_callback():
         stroke_shader.bind()
         stroke_shader.uniform_float("viewportSize", (region.width, region.height))
         stroke_shader.uniform_float("lineWidth", settings.line_width)
+        last_color = None
         for cached_batches, _, stroke_color in draw_data:
             if cached_batches['stroke_batches']:
-                stroke_shader.uniform_float("color", stroke_color)
+                if stroke_color != last_color:
+                    stroke_shader.uniform_float("color", stroke_color)
+                    last_color = stroke_color
                 for batch in cached_batches['stroke_batches']:
                     batch.draw(stroke_shader)
 
@@ -1022,7 +1180,7 @@ def get_keyframe_based_frames(gp_obj, settings, current_frame):
     """
     Get frames to show in GP Keyframes mode.
 
-    PERFORMANCE: Uses cached sorted keyframe list to avoid iterating all
+    PERFORMANCE: Uses a cached sorted int32 keyframe array to avoid iterating all
     layers/keyframes on every viewport draw.
     """
     global _keyframe_cache, _keyframe_cache_gp
@@ -1033,42 +1191,27 @@ def get_keyframe_based_frames(gp_obj, settings, current_frame):
         return frames_to_show
 
     # Check if we need to rebuild the keyframe cache
-    if _keyframe_cache is None or _keyframe_cache_gp != gp_obj:
-        # Collect all unique keyframe numbers (expensive - only do once)
-        all_keyframes = set()
-        for layer in gp_obj.data.layers:
-            if layer.hide:
-                continue
-            for kf in layer.frames:
-                all_keyframes.add(kf.frame_number)
-
-        _keyframe_cache = sorted(all_keyframes)
+    if _keyframe_cache is None or _keyframe_cache_gp is not gp_obj:  # Identity check (P8)
+        # Unique keyframe numbers come from the shared visible-keyframe set in cache.py
+        keyframe_set = get_keyframe_set(gp_obj)
+        _keyframe_cache = np.fromiter(keyframe_set, dtype=np.int32, count=len(keyframe_set))
+        _keyframe_cache.sort()
         _keyframe_cache_gp = gp_obj
 
     sorted_keyframes = _keyframe_cache
 
-    if not sorted_keyframes:
+    if not len(sorted_keyframes):
         return frames_to_show
 
     # Find current keyframe index using binary search (O(log n) instead of O(n))
-    idx = bisect.bisect_right(sorted_keyframes, current_frame)
-    current_idx = idx - 1 if idx > 0 else 0
-
-    # Clamp to valid range
-    if current_idx >= len(sorted_keyframes):
-        current_idx = len(sorted_keyframes) - 1
-
-    # Get keyframes before
-    for i in range(1, settings.frames_before + 1):
-        idx = current_idx - i
-        if idx >= 0:
-            frames_to_show.append((-i, sorted_keyframes[idx]))
+    # Before the first keyframe, that keyframe counts as current
+    current_idx = max(int(np.searchsorted(sorted_keyframes, current_frame, side='right')) - 1, 0)
 
-    # Get keyframes after
-    for i in range(1, settings.frames_after + 1):
-        idx = current_idx + i
-        if idx < len(sorted_keyframes):
-            frames_to_show.append((i, sorted_keyframes[idx]))
+    # Neighbouring keyframes are plain slices - nearest first on the before side
+    before = sorted_keyframes[max(current_idx - settings.frames_before, 0):current_idx][::-1]
+    after = sorted_keyframes[current_idx + 1:current_idx + 1 + settings.frames_after]
+    frames_to_show.extend(zip(range(-1, -len(before) - 1, -1), before.tolist()))
+    frames_to_show.extend(zip(range(1, len(after) + 1), after.tolist()))
 
     return frames_to_show
 
@@ -1127,7 +1270,7 @@ def draw_motion_path_callback():
         return
 
     # Check if cache needs rebuild (dirty or different GP object)
-    if _motion_path_dirty or _motion_path_cache is None or _motion_path_cache_gp != gp_obj:
+    if _motion_path_dirty or _motion_path_cache is None or _motion_path_cache_gp is not gp_obj:
         # Rebuild cache by sampling object animation data
         # Only if there is animation data
         if not gp_obj.animation_data or not gp_obj.animation_data.action:
@@ -1152,7 +1295,8 @@ def draw_motion_path_callback():
         # No need for Catmull-Rom subdivision - just sample at high resolution
         MOTION_PATH_SAMPLES = 500  # Fixed sample count - enough for sharp Bezier curves
 
-        points = []
+        points = []  # (x, y, z) samples before shrinkwrap
+        shrinkwrap_points = False  # frame_set fallback samples are drawn as-is
 
         # Get location fcurves
         fcurves = gp_obj.animation_data.action.fcurves
@@ -1179,8 +1323,7 @@ def draw_motion_path_callback():
             step = max(1, duration // MOTION_PATH_SAMPLES)
             for f in range(start_frame, end_frame + 1, step):
                 scene.frame_set(f)
-                pos = gp_obj.location.copy()
-                points.append(pos)
+                points.append(gp_obj.location[:])
             scene.frame_set(original_frame)
         else:
             # Build keyframe list with positions and interpolation type
@@ -1197,26 +1340,7 @@ def draw_motion_path_callback():
                         'interp': kp.interpolation,  # 'CONSTANT', 'BEZIER', 'LINEAR'
                     })
             keyframes.sort(key=lambda k: k['frame'])
-
-            # v9.5: Helper: apply shrinkwrap raycast + surface normal offset
-            def apply_shrinkwrap(pos):
-                if settings.depth_interaction_enabled and depsgraph:
-                    ray_origin = Vector((pos.x, pos.y, pos.z + 1000.0))
-                    ray_dir = Vector((0, 0, -1))
-                    hit, location, normal, index, hit_obj, matrix = scene.ray_cast(
-                        depsgraph, ray_origin, ray_dir
-                    )
-                    if hit and hit_obj != gp_obj:
-                        pos.z = location.z + SURFACE_OFFSET
-                        # Apply surface_offset along surface normal
-                        if offset_magnitude > 0:
-                            pos.x += normal.x * offset_magnitude
-                            pos.y += normal.y * offset_magnitude
-                            pos.z += normal.z * offset_magnitude
-                elif offset_magnitude > 0:
-                    # Fallback: global Z offset when shrinkwrap disabled
-                    pos.z += offset_magnitude
-                return pos
+            shrinkwrap_points = True
 
             # Sample between keyframes, handling constant interpolation specially
             if len(keyframes) < 2:
@@ -1224,15 +1348,13 @@ def draw_motion_path_callback():
                 frame_step = duration / MOTION_PATH_SAMPLES if MOTION_PATH_SAMPLES > 0 else 1
                 for i in range(MOTION_PATH_SAMPLES + 1):
                     f = start_frame + i * frame_step
-                    pos = Vector((fc_x.evaluate(f), fc_y.evaluate(f), fc_z.evaluate(f)))
-                    points.append(apply_shrinkwrap(pos))
+                    points.append((fc_x.evaluate(f), fc_y.evaluate(f), fc_z.evaluate(f)))
             else:
                 # Multiple keyframes - handle each segment
                 for i, kf in enumerate(keyframes):
                     if i + 1 >= len(keyframes):
                         # Last keyframe - add final point
-                        pos = Vector((kf['x'], kf['y'], kf['z']))
-                        points.append(apply_shrinkwrap(pos))
+                        points.append((kf['x'], kf['y'], kf['z']))
                         break
 
                     next_kf = keyframes[i + 1]
@@ -1261,28 +1383,55 @@ def draw_motion_path_callback():
                             y = fc_y.evaluate(f)
                             z = fc_z.evaluate(f)
 
-                        pos = Vector((x, y, z))
-                        points.append(apply_shrinkwrap(pos))
+                        points.append((x, y, z))
+
+        # PERFORMANCE: Structure-of-arrays path - one (N, 3) array, only the raycasts
+        # stay per point, shrinkwrap and offsets are applied as masked array ops
+        points = np.array(points, dtype=np.float64).reshape(-1, 3)
+
+        # v9.5: Apply shrinkwrap raycast + surface normal offset
+        if shrinkwrap_points:
+            if settings.depth_interaction_enabled and depsgraph:
+                num_points = len(points)
+                hit_mask = np.zeros(num_points, dtype=bool)
+                hit_z = np.empty(num_points)
+                normals = np.empty((num_points, 3))
+                ray_cache = {}  # Scoped to this rebuild - segment ends repeat keyframe positions
+                for i, (x, y, z) in enumerate(points.tolist()):
+                    result = raycast_down(scene, depsgraph, x, y, z, gp_obj, ray_cache)
+                    if result is not None:
+                        hit_mask[i] = True
+                        hit_z[i], normals[i] = result
+                points[hit_mask, 2] = hit_z[hit_mask] + SURFACE_OFFSET
+                # Apply surface_offset along surface normal
+                if offset_magnitude > 0:
+                    points[hit_mask] += normals[hit_mask] * offset_magnitude
+            elif offset_magnitude > 0:
+                # Fallback: global Z offset when shrinkwrap disabled
+                points[:, 2] += offset_magnitude
 
         _motion_path_cache = points
         _motion_path_cache_gp = gp_obj
         _motion_path_dirty = False
 
         # Build GPU batch directly - no smoothing needed, F-curves are already smooth
-        coords = [(p.x, p.y, p.z) for p in points]
+        # PERFORMANCE: Pack the samples into one float32 array, shared by the line
+        # and point batches (uploaded through the buffer protocol)
+        coords = points.astype(np.float32)
         _motion_path_coords = coords
         _motion_path_line_batch = batch_for_shader(
             _get_stroke_shader(), 'LINE_STRIP', {"pos": _motion_path_coords}
         )
         # Points batch uses original unsmoothed positions for keyframe markers
         _motion_path_point_batch = batch_for_shader(
-            _get_point_shader(), 'POINTS', {"pos": [(p.x, p.y, p.z) for p in points]}
+            _get_point_shader(), 'POINTS', {"pos": _motion_path_coords}
         )
 
         # Timing Chart: Keyframe dots + Inbetween dots
         # Both use 3D point sprites (POINTS primitive) - angle-independent rendering
         # Uses F-curve evaluation to match path exactly (respects Bezier interpolation)
-        log(f"SPACING_DOTS: enabled={settings.motion_path_spacing_dots_enabled} coords_len={len(coords)}", "DOTS")
+        if _LOG_ENABLED:
+            log(f"SPACING_DOTS: enabled={settings.motion_path_spacing_dots_enabled} coords_len={len(coords)}", "DOTS")
         if settings.motion_path_spacing_dots_enabled and fc_x and fc_x.keyframe_points:
             inbetween_point_coords = []  # 3D dots for inbetweens
             keyframe_point_coords = []   # 3D dots for keyframes
@@ -1307,17 +1456,11 @@ def draw_motion_path_callback():
             # Helper: find Z from motion path points (already shrinkwrapped)
             def get_z_from_motion_path(xy_pos):
                 """Find the nearest motion path point and return its Z value."""
-                if not points:
+                if not len(points):
                     return xy_pos.z
-                # Find closest point by XY distance
-                best_z = points[0].z
-                best_dist_sq = float('inf')
-                for p in points:
-                    dist_sq = (p.x - xy_pos.x)**2 + (p.y - xy_pos.y)**2
-                    if dist_sq < best_dist_sq:
-                        best_dist_sq = dist_sq
-                        best_z = p.z
-                return best_z
+                # Find closest point by XY distance - one vectorized pass over the path
+                dist_sq = (points[:, 0] - xy_pos.x) ** 2 + (points[:, 1] - xy_pos.y) ** 2
+                return float(points[int(dist_sq.argmin()), 2])
 
             # Helper: get position for frame, handling constant interpolation
             def get_position_for_frame(frame):
@@ -1396,14 +1539,9 @@ def draw_motion_path_callback():
             if settings.motion_path_arrows_enabled and len(points) >= 2:
                 # Use the path's actual last point for arrow position (already has shrinkwrap applied)
                 # This ensures the arrow sits exactly on the path, not floating above it
-                last_point = points[-1]
-                second_last = points[-2]
+                last_point = Vector(points[-1])
                 # Compute tangent from the last segment of the actual path
-                tangent = Vector((
-                    last_point.x - second_last.x,
-                    last_point.y - second_last.y,
-                    last_point.z - second_last.z
-                ))
+                tangent = last_point - Vector(points[-2])
                 # Create arrow data using actual path end point
                 arrow_data = [(last_point, end_frame, tangent)]
                 arrow_lines = _build_arrow_geometry(arrow_data, settings.motion_path_arrows_size)
@@ -1422,7 +1560,7 @@ def draw_motion_path_callback():
             _motion_path_arrows_batch = None
 
     path_points = _motion_path_cache
-    if not path_points or len(path_points) < 2:
+    if path_points is None or len(path_points) < 2:
         return
 
     # Check if batches are available
@@ -1488,7 +1626,8 @@ def draw_motion_path_callback():
         stroke_shader = _get_stroke_shader()
 
         # Draw Timing Chart: Inbetween ticks first, then keyframe circles on top
-        log(f"DRAW_TIMING: enabled={settings.motion_path_spacing_dots_enabled} ticks={_motion_path_inbetween_ticks_batch is not None} circles={_motion_path_keyframe_circles_batch is not None}", "DOTS")
+        if _LOG_ENABLED:  # Runs every redraw - skip building the message when logging is off
+            log(f"DRAW_TIMING: enabled={settings.motion_path_spacing_dots_enabled} ticks={_motion_path_inbetween_ticks_batch is not None} circles={_motion_path_keyframe_circles_batch is not None}", "DOTS")
         if settings.motion_path_spacing_dots_enabled:
             # Use LESS_EQUAL depth test so ticks are occluded by mesh (like motion path line)
             gpu.state.depth_test_set('LESS_EQUAL')
@@ -1620,6 +1759,10 @@ def register_draw_handlers():
     global _draw_handler, _motion_path_handler, _motion_path_labels_handler
     global _motion_path_cache, _motion_path_cache_gp, _motion_path_dirty
 
+    # Headless sessions (command-line renders, pipelines) have no viewport to draw into
+    if bpy.app.background:
+        return
+
     if _draw_handler is None:
         _draw_handler = bpy.types.SpaceView3D.draw_handler_add(
             draw_onion_callback, (), 'WINDOW', 'POST_VIEW'
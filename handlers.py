@@ -6,23 +6,27 @@ import bpy
 from bpy.app.handlers import persistent
 from mathutils import Vector
 
-from .cache import cache_current_frame, clear_cache, get_active_gp
+from .cache import cache_current_frame, clear_cache, get_active_gp, invalidate_held_strokes
 from .anchors import (
-    get_anchor_for_frame,
+    get_anchor_xyz_for_frame,
     set_anchor_for_frame,
     remove_anchor_for_frame,
     calculate_anchor_from_strokes,
     get_current_keyframes_set,
     get_visible_keyframe,
     migrate_anchor_data,
+    invalidate_anchor_json_cache,
+    invalidate_keyframe_index,
+    AnchorBatch,
 )
 from .transforms import align_canvas_to_cursor, ensure_billboard_constraint
 from .drawing import invalidate_motion_path
-from .debug_log import log, log_frame_change
+from .debug_log import log, log_frame_change, _ENABLED as _LOG_ENABLED
 
 
 # Global tracking state
 _last_keyframe_set = set()
+_last_layer_count = 0  # Catches layer removal the visible keyframe set misses (hidden layers)
 _last_active_layer_name = None
 _last_active_gp = None  # Track active GP object for change detection
 _in_depsgraph_handler = False  # Prevent recursive handler calls
@@ -101,8 +105,10 @@ def on_frame_change(scene):
         ensure_shrinkwrap_valid(gp_obj, settings, scene)
 
     # === ONION SKIN CACHE ===
-    # Cache strokes for onion skin drawing
-    cache_current_frame(gp_obj, settings)
+    # Cache strokes for onion skin drawing - skipped headless, where nothing
+    # draws them (shrinkwrap and billboard above still apply to renders)
+    if not bpy.app.background:
+        cache_current_frame(gp_obj, settings)
 
     # NOTE: Keyframe set update moved to depsgraph handler (P5 optimization)
     # Only updates when gp_data_changed, not on every frame scrub.
@@ -137,7 +143,7 @@ def _on_depsgraph_update_impl(scene, depsgraph):
     PERFORMANCE (P8): Uses identity checks and cached attribute lookups.
     PERFORMANCE (P5): Keyframe set update moved here from frame_change handler.
     """
-    global _last_keyframe_set, _last_active_layer_name, _last_active_gp
+    global _last_keyframe_set, _last_layer_count, _last_active_layer_name, _last_active_gp
 
     if not hasattr(scene, 'world_onion'):
         return
@@ -188,15 +194,18 @@ def _on_depsgraph_update_impl(scene, depsgraph):
             elif isinstance(update_id, bpy.types.Action) and update_id.name == action.name:
                 animation_changed = True
 
-    # Invalidate motion path AND onion cache on GP data OR animation change
+    # Invalidate motion path and held strokes on GP data OR animation change
     if gp_data_changed or animation_changed:
-        invalidate_motion_path()
-        # Also invalidate onion GPU batch cache so strokes refresh immediately
-        # This fixes the "stale onion skin while editing" bug
-        from .drawing import invalidate_onion_batch_cache, invalidate_keyframe_cache
-        invalidate_onion_batch_cache()
-        # P7: Also invalidate keyframe cache since keyframes may have changed
-        invalidate_keyframe_cache()
+        # The motion path only samples the object's location F-curves - stroke
+        # edits while drawing leave it valid, so skip the full path rebuild
+        if animation_changed:
+            invalidate_motion_path()
+        # Onion GPU batches are NOT cleared here: they are built from the stroke
+        # cache, and cache_current_frame() drops a frame's batches whenever it
+        # replaces that frame's strokes - other frames' batches stay valid
+        # P7: Keyframe caches are invalidated below, only if keyframes changed
+        # Stroke edits don't change held-drawing fingerprints - stop reusing old strokes
+        invalidate_held_strokes()
         # Force viewport redraw for immediate feedback
         _tag_viewport_redraw()
 
@@ -214,73 +223,85 @@ def _on_depsgraph_update_impl(scene, depsgraph):
     # Detect keyframe changes (P5: only when GP data changes, not every frame)
     if gp_data_changed:
         current_kf_set = get_current_keyframes_set(gp_obj, settings)
+        layer_count = len(gp_obj.data.layers)
+
+        # Stroke edits leave the visible (layer, frame) set untouched - keep the
+        # sorted keyframe caches unless keyframes, layer visibility or layers changed
+        if current_kf_set != _last_keyframe_set or layer_count != _last_layer_count:
+            from .drawing import invalidate_keyframe_cache
+            invalidate_keyframe_cache()
+        _last_layer_count = layer_count
 
         # Only do comparison if we have a previous set to compare against
         # On first run, _last_keyframe_set is empty - just initialize it
         if _last_keyframe_set:
-            # Track moved keyframes for anchor migration
-            removed_by_layer = {}
-            added_by_layer = {}
-
-            for layer_name, frame in (_last_keyframe_set - current_kf_set):
-                removed_by_layer.setdefault(layer_name, []).append(frame)
-
-            for layer_name, frame in (current_kf_set - _last_keyframe_set):
-                added_by_layer.setdefault(layer_name, []).append(frame)
-
-            # Check for moves
-            for layer_name in removed_by_layer:
-                if layer_name in added_by_layer:
-                    removed = removed_by_layer[layer_name]
-                    added = added_by_layer[layer_name]
-                    if len(removed) == 1 and len(added) == 1:
-                        old_frame = removed[0]
-                        new_frame = added[0]
-                        migrate_anchor_data(gp_obj, layer_name, old_frame, new_frame)
-                    elif len(removed) == len(added):
-                        removed_sorted = sorted(removed)
-                        added_sorted = sorted(added)
-                        for old_frame, new_frame in zip(removed_sorted, added_sorted):
+            # Batch anchor writes - migrations/deletions serialize JSON once on exit
+            with AnchorBatch(gp_obj):
+                # Track moved keyframes for anchor migration
+                removed_by_layer = {}
+                added_by_layer = {}
+
+                for layer_name, frame in (_last_keyframe_set - current_kf_set):
+                    removed_by_layer.setdefault(layer_name, []).append(frame)
+
+                for layer_name, frame in (current_kf_set - _last_keyframe_set):
+                    added_by_layer.setdefault(layer_name, []).append(frame)
+
+                # Check for moves
+                for layer_name in removed_by_layer:
+                    if layer_name in added_by_layer:
+                        removed = removed_by_layer[layer_name]
+                        added = added_by_layer[layer_name]
+                        if len(removed) == 1 and len(added) == 1:
+                            old_frame = removed[0]
+                            new_frame = added[0]
                             migrate_anchor_data(gp_obj, layer_name, old_frame, new_frame)
-
-            # Handle deleted keyframes - remove their anchors
-            # A keyframe is truly deleted if it was removed but not moved (no matching add)
-            anchors_deleted = False  # v9.4: Track if we deleted any anchors
-            for layer_name, removed_frames in removed_by_layer.items():
-                added_frames = added_by_layer.get(layer_name, [])
-                if len(removed_frames) > len(added_frames):
-                    # More removed than added = some were deleted (not moved)
-                    # Delete anchors for the extra removed frames
-                    # Sort both to match moves, then delete unmatched
-                    removed_sorted = sorted(removed_frames)
-                    num_moved = len(added_frames)
-                    for frame in removed_sorted[num_moved:]:
-                        remove_anchor_for_frame(gp_obj, layer_name, frame)
-                        anchors_deleted = True
-                        log(f"ANCHOR_DELETE: removed anchor for deleted keyframe layer={layer_name} frame={frame}", "ANCHOR")
-                elif layer_name not in added_by_layer:
-                    # All keyframes in this layer were deleted (none moved)
-                    for frame in removed_frames:
-                        remove_anchor_for_frame(gp_obj, layer_name, frame)
-                        anchors_deleted = True
-                        log(f"ANCHOR_DELETE: removed anchor for deleted keyframe layer={layer_name} frame={frame}", "ANCHOR")
-
-            # v9.4: Force UI redraw if anchors were deleted (updates "X anchors stored" count)
-            if anchors_deleted:
-                _tag_viewport_redraw()
-
-            # Handle new keyframes
-            if settings.anchor_enabled:
-                current_frame = scene.frame_current
-                new_keyframes = current_kf_set - _last_keyframe_set
-
-                for layer_name, frame_num in new_keyframes:
-                    if frame_num == current_frame:
-                        # Capture cursor as anchor for new keyframes
-                        existing_anchor = get_anchor_for_frame(gp_obj, layer_name, frame_num)
-                        if existing_anchor is None:
-                            cursor_pos = scene.cursor.location.copy()
-                            set_anchor_for_frame(gp_obj, layer_name, frame_num, cursor_pos)
+                        elif len(removed) == len(added):
+                            removed_sorted = sorted(removed)
+                            added_sorted = sorted(added)
+                            for old_frame, new_frame in zip(removed_sorted, added_sorted):
+                                migrate_anchor_data(gp_obj, layer_name, old_frame, new_frame)
+
+                # Handle deleted keyframes - remove their anchors
+                # A keyframe is truly deleted if it was removed but not moved (no matching add)
+                anchors_deleted = False  # v9.4: Track if we deleted any anchors
+                for layer_name, removed_frames in removed_by_layer.items():
+                    added_frames = added_by_layer.get(layer_name, [])
+                    if len(removed_frames) > len(added_frames):
+                        # More removed than added = some were deleted (not moved)
+                        # Delete anchors for the extra removed frames
+                        # Sort both to match moves, then delete unmatched
+                        removed_sorted = sorted(removed_frames)
+                        num_moved = len(added_frames)
+                        for frame in removed_sorted[num_moved:]:
+                            remove_anchor_for_frame(gp_obj, layer_name, frame)
+                            anchors_deleted = True
+                            if _LOG_ENABLED:
+                                log(f"ANCHOR_DELETE: removed anchor for deleted keyframe layer={layer_name} frame={frame}", "ANCHOR")
+                    elif layer_name not in added_by_layer:
+                        # All keyframes in this layer were deleted (none moved)
+                        for frame in removed_frames:
+                            remove_anchor_for_frame(gp_obj, layer_name, frame)
+                            anchors_deleted = True
+                            if _LOG_ENABLED:
+                                log(f"ANCHOR_DELETE: removed anchor for deleted keyframe layer={layer_name} frame={frame}", "ANCHOR")
+
+                # v9.4: Force UI redraw if anchors were deleted (updates "X anchors stored" count)
+                if anchors_deleted:
+                    _tag_viewport_redraw()
+
+                # Handle new keyframes
+                if settings.anchor_enabled:
+                    current_frame = scene.frame_current
+                    new_keyframes = current_kf_set - _last_keyframe_set
+
+                    for layer_name, frame_num in new_keyframes:
+                        if frame_num == current_frame:
+                            # Capture cursor as anchor for new keyframes
+                            existing_anchor = get_anchor_xyz_for_frame(gp_obj, layer_name, frame_num)
+                            if existing_anchor is None:
+                                # set_anchor_for_frame copies the components - no Vector copy needed
+                                set_anchor_for_frame(gp_obj, layer_name, frame_num, scene.cursor.location)
 
         _last_keyframe_set = current_kf_set
 
@@ -289,6 +310,9 @@ def _on_depsgraph_update_impl(scene, depsgraph):
 def on_load_post(dummy):
     """Clear cache when loading a new file."""
     clear_cache()
+    # Object pointers are reused across files - drop parsed anchor data too
+    invalidate_anchor_json_cache()
+    invalidate_keyframe_index()
 
 
 @persistent
@@ -302,6 +326,7 @@ def on_undo_post(scene):
     """
     clear_cache()
     invalidate_motion_path()
+    invalidate_anchor_json_cache()
     from .drawing import invalidate_onion_batch_cache, invalidate_keyframe_cache
     invalidate_onion_batch_cache()
     invalidate_keyframe_cache()  # P7: Keyframes may have been undone
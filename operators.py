@@ -11,7 +11,7 @@ from .cache import clear_cache, get_cache, get_cache_stats, get_active_gp
 from .anchors import (
     get_anchors,
     set_anchors,
-    get_anchor_for_frame,
+    get_anchor_xyz_for_frame,
     set_anchor_for_frame,
     remove_anchor_for_frame,
     calculate_anchor_from_strokes,
@@ -20,7 +20,7 @@ from .anchors import (
 )
 from .transforms import get_layer_transform, align_canvas_to_cursor, ensure_billboard_constraint, align_strokes_to_camera
 from .drawing import invalidate_motion_path, get_baked_offset, is_driver_setup_pending, complete_pending_driver_setup
-from .debug_log import log
+from .debug_log import log, _ENABLED as _LOG_ENABLED
 
 # v8.5: Track if cursor sync modal is running
 _cursor_sync_running = False
@@ -140,12 +140,13 @@ class WONION_OT_cursor_sync(bpy.types.Operator):
                     if gp_obj:
                         active_layer = gp_obj.data.layers.active
                         if active_layer:
-                            anchor_pos = get_anchor_for_frame(gp_obj, active_layer.name, current_frame)
+                            anchor_pos = get_anchor_xyz_for_frame(gp_obj, active_layer.name, current_frame)
                             if anchor_pos is not None:
                                 _cursor_set_programmatically = True  # v9.4: Prevent OBJECT_FOLLOWS feedback
-                                context.scene.cursor.location = anchor_pos.copy()
+                                context.scene.cursor.location = anchor_pos
                                 set_last_cursor_synced_frame(current_frame)
-                                log(f"ANCHOR_SYNC_ON_STOP frame={current_frame}", "CURSOR")
+                                if _LOG_ENABLED:
+                                    log(f"ANCHOR_SYNC_ON_STOP frame={current_frame}", "CURSOR")
 
                 # v9.3: Complete pending driver setup now that playback stopped
                 # This is a safe context - modal callbacks can modify ID data
@@ -177,12 +178,13 @@ class WONION_OT_cursor_sync(bpy.types.Operator):
                             active_layer = gp_obj.data.layers.active
                             if active_layer:
                                 # Look up stored anchor for this frame
-                                anchor_pos = get_anchor_for_frame(gp_obj, active_layer.name, current_frame)
+                                anchor_pos = get_anchor_xyz_for_frame(gp_obj, active_layer.name, current_frame)
                                 if anchor_pos is not None:
                                     _cursor_set_programmatically = True  # v9.4: Prevent OBJECT_FOLLOWS feedback
-                                    context.scene.cursor.location = anchor_pos.copy()
+                                    context.scene.cursor.location = anchor_pos
                                     set_last_cursor_synced_frame(current_frame)
-                                    log(f"ANCHOR_SYNC frame={current_frame}", "CURSOR")
+                                    if _LOG_ENABLED:
+                                        log(f"ANCHOR_SYNC frame={current_frame}", "CURSOR")
 
             # === CURSOR FOLLOWS OBJECT MODE ===
             # Continuously sync cursor to object BASE position (runs every timer tick when stationary)
@@ -197,7 +199,7 @@ class WONION_OT_cursor_sync(bpy.types.Operator):
                     # Only update if cursor is not already at object position
                     if (obj_pos - cursor_pos).length > 0.0001:
                         _cursor_set_programmatically = True  # v9.4: Prevent OBJECT_FOLLOWS feedback
-                        context.scene.cursor.location = obj_pos.copy()
+                        context.scene.cursor.location = obj_pos
 
             # === AUTO-DRAW MODE: Object follows Cursor ===
             # When cursor moves and settles (100ms debounce), move object to cursor
@@ -205,6 +207,8 @@ class WONION_OT_cursor_sync(bpy.types.Operator):
             # v9.4: Only respond to USER cursor movement, not programmatic cursor updates
             if not is_animating and settings.anchor_enabled and settings.anchor_sync_mode == 'OBJECT_FOLLOWS':
                 scene = context.scene
+                # Owned copy - the cursor wrapper is live; assignments below copy values,
+                # so current_cursor itself never needs copying again
                 current_cursor = scene.cursor.location.copy()
 
                 # v9.4: Check if cursor was set programmatically (by anchor sync or CURSOR_FOLLOWS)
@@ -213,7 +217,7 @@ class WONION_OT_cursor_sync(bpy.types.Operator):
                     _cursor_set_programmatically = False
                     self._last_cursor_pos = current_cursor
                     self._triggered_for_position = True  # Prevent triggering for this position
-                    self._triggered_cursor_pos = current_cursor.copy()
+                    self._triggered_cursor_pos = current_cursor
                     log("OBJECT_FOLLOWS: Skipping - cursor was set programmatically", "CURSOR")
                 elif self._last_cursor_pos is None:
                     self._last_cursor_pos = current_cursor
@@ -252,7 +256,7 @@ class WONION_OT_cursor_sync(bpy.types.Operator):
                                             )
 
                                         # Simple object move - strokes follow (no compensation)
-                                        gp_obj.location = current_cursor.copy()
+                                        gp_obj.location = current_cursor
                                         gp_obj.keyframe_insert(data_path="location", frame=scene.frame_current)
 
                                         # Store anchor metadata
@@ -265,7 +269,7 @@ class WONION_OT_cursor_sync(bpy.types.Operator):
                                         log(f"AUTO_DRAW FAILED: {e}", "ERROR")
 
                             self._triggered_for_position = True
-                            self._triggered_cursor_pos = current_cursor.copy()
+                            self._triggered_cursor_pos = current_cursor
 
         return {'PASS_THROUGH'}
 
@@ -416,22 +420,15 @@ def set_anchor_logic(context, gp_obj, scene, target_world_pos, move_selected_str
         log("  CANCELLED: no active layer", "SNAP")
         return {'CANCELLED'}
 
-    # Find active keyframe
+    # Find active keyframe - one bisect gives the visible keyframe, which is the
+    # active one when it sits exactly on the current frame
     active_kf = None
     keyframe_copied = False  # Track if we copied a keyframe (held frame case)
-    for kf in active_layer.frames:
-        if kf.frame_number == current_frame:
-            active_kf = kf
-            break
+    visible_kf = get_visible_keyframe(active_layer, current_frame)
+    if visible_kf is not None and visible_kf.frame_number == current_frame:
+        active_kf = visible_kf
 
     if active_kf is None:
-        # Find visible
-        visible_kf = None
-        for kf in active_layer.frames:
-            if kf.frame_number <= current_frame:
-                if visible_kf is None or kf.frame_number > visible_kf.frame_number:
-                    visible_kf = kf
-
         if visible_kf:
             # Create new keyframe at current frame
             log(f"  Copying visible keyframe from {visible_kf.frame_number} to {current_frame}", "SNAP")
@@ -662,7 +659,7 @@ def set_anchor_logic(context, gp_obj, scene, target_world_pos, move_selected_str
     # We must re-cache now that strokes have been transformed to new positions.
     from .cache import cache_current_frame
     settings = scene.world_onion
-    cache_current_frame(gp_obj, settings)
+    cache_current_frame(gp_obj, settings, reuse_held=False)
     log("  Re-cached current frame after stroke transform", "SNAP")
 
     for area in context.screen.areas:
@@ -907,20 +904,11 @@ class WONION_OT_align_to_view(bpy.types.Operator):
 
         current_frame = scene.frame_current
 
-        # Find active keyframe
-        active_kf = None
-        for kf in active_layer.frames:
-            if kf.frame_number == current_frame:
-                active_kf = kf
-                break
-
+        # Find active keyframe (exact match or held visible keyframe)
+        active_kf = get_visible_keyframe(active_layer, current_frame)
         if active_kf is None:
-            # Find visible keyframe
-            visible_kf = get_visible_keyframe(active_layer, current_frame)
-            if visible_kf is None:
-                self.report({'WARNING'}, "No keyframe found")
-                return {'CANCELLED'}
-            active_kf = visible_kf
+            self.report({'WARNING'}, "No keyframe found")
+            return {'CANCELLED'}
 
         drawing = active_kf.drawing
         if drawing is None or len(drawing.strokes) == 0:
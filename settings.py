@@ -4,20 +4,18 @@ Settings and property definitions for world-space onion skinning.
 
 import bpy
 
-from .cache import clear_cache, cache_current_frame, get_active_gp
-from .drawing import (
-    register_draw_handlers, unregister_draw_handlers,
-    bake_shrinkwrap_offsets, invalidate_baked_offsets,
-    invalidate_motion_path, remove_shrinkwrap_driver,
-    invalidate_onion_batch_cache, complete_pending_driver_setup,
-)
-from .anchors import get_current_keyframes_set
-from .handlers import set_last_keyframe_set, set_last_active_layer_name
-from .transforms import align_canvas_to_cursor
+# NOTE: Submodule imports live inside the update callbacks so that importing
+# settings (done eagerly by __init__.py) doesn't pull in drawing/handlers/etc.
+# Those modules are loaded by register().
 
 
 def update_enabled(self, context):
     """Called when addon is enabled/disabled."""
+    from .cache import cache_current_frame, get_active_gp
+    from .drawing import register_draw_handlers, unregister_draw_handlers
+    from .anchors import get_current_keyframes_set
+    from .handlers import set_last_keyframe_set
+
     if self.enabled:
         register_draw_handlers()
         # v8.5: Start cursor sync modal operator for reliable cursor tracking
@@ -57,6 +55,8 @@ def update_setting(self, context):
 
 def update_motion_path_setting(self, context):
     """Called when motion path geometry settings change (smoothing)."""
+    from .drawing import invalidate_motion_path
+
     # Invalidate motion path cache so it rebuilds with new smoothing
     invalidate_motion_path()
     # Redraw viewports
@@ -73,6 +73,8 @@ def update_anchor_enabled(self, context):
     v8.2: Canvas alignment is done HERE (once) instead of every frame change.
     This avoids 'Writing to ID classes not allowed' errors during timeline scrubbing.
     """
+    from .transforms import align_canvas_to_cursor
+
     if self.anchor_enabled:
         # Set canvas to follow cursor - this setting PERSISTS
         try:
@@ -90,13 +92,20 @@ def update_anchor_enabled(self, context):
 
 def update_realtime(self, context):
     """Called when realtime settings change (Z offset, shrinkwrap) - apply immediately."""
+    from .cache import get_active_gp
+    from .drawing import (
+        bake_shrinkwrap_offsets, invalidate_baked_offsets,
+        invalidate_motion_path, remove_shrinkwrap_driver,
+        complete_pending_driver_setup,
+    )
+
     # NOTE: DO NOT clear stroke cache here!
     # Z offset is applied at draw time, not stored in cache.
     # Clearing cache on every slider adjustment was causing massive lag.
     # Only shrinkwrap state change requires special handling (baking).
 
-    # Invalidate GPU batch cache since z_offset affects batch geometry
-    invalidate_onion_batch_cache()
+    # No onion batch invalidation: the draw callback notices surface_offset and
+    # bake changes itself and rebuilds stale frames from their kept coords
 
     # Auto-bake shrinkwrap offsets when shrinkwrap is enabled
     # This ensures we have baked data before playback starts
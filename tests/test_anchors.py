@@ -0,0 +1,190 @@
+"""
+Anchor storage tests. Need Blender's bpy, so run inside Blender:
+
+    blender -b --python-expr "import sys, pytest; sys.exit(pytest.main(['tests']))"
+"""
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+_ROOT = Path(__file__).resolve().parent.parent
+_PKG = "world_onion_test"
+
+
+def _load_addon():
+    """Import the addon package from the repo root under a fixed name."""
+    if _PKG not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            _PKG, _ROOT / "__init__.py", submodule_search_locations=[str(_ROOT)]
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[_PKG] = module
+        spec.loader.exec_module(module)
+    return importlib.import_module(_PKG + ".anchors")
+
+
+anchors = _load_addon()
+
+LONG_LAYER = "Storyboard panel 12 - character turnaround, background plate, final"
+SHORT_LAYER = "Lines"
+
+
+@pytest.fixture
+def obj():
+    ob = bpy.data.objects.new("anchor_test", None)
+    anchors.invalidate_anchor_json_cache()
+    yield ob
+    anchors.invalidate_anchor_json_cache()
+    bpy.data.objects.remove(ob)
+
+
+def test_long_layer_name_round_trips(obj):
+    anchors.set_anchor_for_frame(obj, LONG_LAYER, 5, (1.0, 2.0, 3.0))
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 5, (4.0, 5.0, 6.0))
+
+    anchors.invalidate_anchor_json_cache()
+    data = anchors.get_anchors(obj, use_cache=False)
+
+    assert data[LONG_LAYER]["5"]["pos"] == [1.0, 2.0, 3.0]
+    assert data[SHORT_LAYER]["5"]["pos"] == [4.0, 5.0, 6.0]
+    assert list(anchors.get_anchor_for_frame(obj, LONG_LAYER, 5)) == [1.0, 2.0, 3.0]
+
+
+def test_long_layer_name_stored_as_json(obj):
+    anchors.set_anchor_for_frame(obj, LONG_LAYER, 1, (0.0, 0.0, 0.0))
+
+    raw = obj[anchors._ANCHOR_PROP]
+    assert isinstance(raw, str)
+    assert LONG_LAYER in json.loads(raw)["data"]
+
+
+def test_long_layer_name_survives_record_updates(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (0.0, 0.0, 0.0))
+    anchors.set_anchor_for_frame(obj, LONG_LAYER, 1, (1.0, 1.0, 1.0))
+    anchors.migrate_anchor_data(obj, LONG_LAYER, 1, 2)
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 3, (2.0, 2.0, 2.0))
+
+    anchors.invalidate_anchor_json_cache()
+    data = anchors.get_anchors(obj, use_cache=False)
+
+    assert set(data[LONG_LAYER]) == {"2"}
+    assert set(data[SHORT_LAYER]) == {"1", "3"}
+
+
+def test_short_layer_names_stay_a_group(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (0.0, 0.0, 0.0))
+
+    assert hasattr(obj[anchors._ANCHOR_PROP], "to_dict")
+
+
+def _stored(obj):
+    return obj[anchors._ANCHOR_PROP].to_dict()
+
+
+def _rev(obj):
+    return obj.get(anchors._ANCHOR_REV_PROP, 0)
+
+
+def test_record_write_leaves_other_records_untouched(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (0.0, 0.0, 0.0))
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 2, (0.0, 0.0, 0.0))
+    # Edit frame 2 behind the cache's back - a full rewrite would restore it
+    obj[anchors._ANCHOR_PROP][SHORT_LAYER]["2"] = {"pos": [9.0, 9.0, 9.0]}
+
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (1.0, 1.0, 1.0))
+
+    stored = _stored(obj)[SHORT_LAYER]
+    assert stored["1"]["pos"] == [1.0, 1.0, 1.0]
+    assert stored["2"]["pos"] == [9.0, 9.0, 9.0]
+
+
+def test_record_write_removes_and_migrates(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (1.0, 1.0, 1.0))
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 2, (2.0, 2.0, 2.0))
+
+    anchors.remove_anchor_for_frame(obj, SHORT_LAYER, 2)
+    anchors.migrate_anchor_data(obj, SHORT_LAYER, 1, 3)
+
+    assert _stored(obj)[SHORT_LAYER] == {"3": {"pos": [1.0, 1.0, 1.0]}}
+
+
+def test_record_write_bumps_revision(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (0.0, 0.0, 0.0))
+    rev = _rev(obj)
+
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 2, (0.0, 0.0, 0.0))
+
+    assert _rev(obj) == rev + 1
+
+
+def test_batch_defers_write_until_exit(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (0.0, 0.0, 0.0))
+    rev = _rev(obj)
+
+    with anchors.AnchorBatch(obj):
+        anchors.set_anchor_for_frame(obj, SHORT_LAYER, 2, (2.0, 2.0, 2.0))
+        anchors.migrate_anchor_data(obj, SHORT_LAYER, 1, 5)
+        assert _rev(obj) == rev
+        assert set(_stored(obj)[SHORT_LAYER]) == {"1"}
+        # Reads inside the batch see the pending edits
+        assert list(anchors.get_anchor_for_frame(obj, SHORT_LAYER, 2)) == [2.0, 2.0, 2.0]
+
+    assert _rev(obj) == rev + 1
+    assert set(_stored(obj)[SHORT_LAYER]) == {"2", "5"}
+
+
+def test_nested_batch_flushes_once_on_outer_exit(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (0.0, 0.0, 0.0))
+    rev = _rev(obj)
+
+    with anchors.AnchorBatch(obj):
+        with anchors.AnchorBatch(obj):
+            anchors.set_anchor_for_frame(obj, SHORT_LAYER, 2, (0.0, 0.0, 0.0))
+        assert _rev(obj) == rev
+        anchors.set_anchor_for_frame(obj, SHORT_LAYER, 3, (0.0, 0.0, 0.0))
+
+    assert _rev(obj) == rev + 1
+    assert set(_stored(obj)[SHORT_LAYER]) == {"1", "2", "3"}
+
+
+def test_batch_without_changes_does_not_write(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (0.0, 0.0, 0.0))
+    rev = _rev(obj)
+
+    with anchors.AnchorBatch(obj):
+        pass
+
+    assert _rev(obj) == rev
+
+
+def test_forced_reparse_in_batch_keeps_pending_edits(obj):
+    with anchors.AnchorBatch(obj):
+        anchors.set_anchor_for_frame(obj, SHORT_LAYER, 4, (4.0, 4.0, 4.0))
+        data = anchors.get_anchors(obj, use_cache=False)
+        assert data[SHORT_LAYER]["4"]["pos"] == [4.0, 4.0, 4.0]
+
+    assert _stored(obj)[SHORT_LAYER]["4"]["pos"] == [4.0, 4.0, 4.0]
+
+
+def test_revision_change_drops_cached_anchors(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (1.0, 1.0, 1.0))
+    assert anchors.get_anchors(obj)[SHORT_LAYER]["1"]["pos"] == [1.0, 1.0, 1.0]
+
+    # External edit (undo, script) that bumps the revision
+    obj[anchors._ANCHOR_PROP][SHORT_LAYER]["1"] = {"pos": [7.0, 7.0, 7.0]}
+    obj[anchors._ANCHOR_REV_PROP] = _rev(obj) + 1
+
+    assert anchors.get_anchors(obj)[SHORT_LAYER]["1"]["pos"] == [7.0, 7.0, 7.0]
+    assert list(anchors.get_anchor_for_frame(obj, SHORT_LAYER, 1)) == [7.0, 7.0, 7.0]
+
+
+def test_unchanged_revision_reuses_cached_anchors(obj):
+    anchors.set_anchor_for_frame(obj, SHORT_LAYER, 1, (1.0, 1.0, 1.0))
+
+    assert anchors.get_anchors(obj) is anchors.get_anchors(obj)
@@ -8,6 +8,8 @@ from mathutils import Matrix, Vector
 
 # Shared constants
 SURFACE_OFFSET = 0.01  # Small offset to keep strokes visible on mesh surfaces
+_RAY_DOWN = (0.0, 0.0, -1.0)
+_RAY_HEIGHT = 1000.0  # Rays start this far above the sample so they clear the object
 
 
 def get_layer_transform(layer):
@@ -200,6 +202,37 @@ def align_strokes_to_camera(stroke_points, anchor_pos, scene):
     return aligned_points
 
 
+def raycast_down(scene, depsgraph, x, y, z, ignore_obj=None, cache=None):
+    """Cast a ray straight down onto the scene from high above (x, y, z).
+
+    Returns (hit_z, (nx, ny, nz)) for the surface hit, or None on a miss or when
+    the first hit is ignore_obj. scene.ray_cast errors propagate to the caller.
+
+    cache: optional dict owned by the caller for the length of one pass (a bake
+    or a motion path rebuild). Rays are vertical and start far above the sample,
+    so results are keyed by (x, y) at millimetre precision. Never keep it across
+    passes - the scene may have changed in between.
+
+    PERFORMANCE: Shared by every shrinkwrap/motion path raycast - plain tuples in
+    and out, no per-ray Vector construction. scene.ray_cast already reuses
+    Blender's cached per-object BVH trees, so no separate BVH is built here.
+    """
+    if cache is not None:
+        key = (round(x, 3), round(y, 3))
+        if key in cache:
+            return cache[key]
+
+    hit, location, normal, _index, hit_obj, _matrix = scene.ray_cast(
+        depsgraph, (x, y, z + _RAY_HEIGHT), _RAY_DOWN
+    )
+    result = None
+    if hit and hit_obj != ignore_obj:
+        result = location.z, (normal.x, normal.y, normal.z)
+    if cache is not None:
+        cache[key] = result
+    return result
+
+
 def adjust_obj_to_surface(gp_obj, scene):
     """
     Adjust GP object location to sit on mesh surface (raycast down).
@@ -215,16 +248,11 @@ def adjust_obj_to_surface(gp_obj, scene):
     current_pos = gp_obj.location
     
     # Raycast down from above
-    ray_origin = Vector((current_pos.x, current_pos.y, current_pos.z + 1000.0))
-    ray_dir = Vector((0, 0, -1))
-    
-    hit, location, normal, index, hit_obj, matrix = scene.ray_cast(
-        depsgraph, ray_origin, ray_dir
-    )
-    
     # Ignore self (the GP object itself won't be hit by ray_cast usually, but to be safe)
-    if hit and hit_obj != gp_obj:
-        new_z = location.z + SURFACE_OFFSET
+    result = raycast_down(scene, depsgraph, current_pos.x, current_pos.y, current_pos.z, gp_obj)
+
+    if result is not None:
+        new_z = result[0] + SURFACE_OFFSET
         # Only update if significant change to avoid float jitter fighting F-Curve
         if abs(new_z - current_pos.z) > 0.0001:
             try: